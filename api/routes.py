@@ -1,8 +1,9 @@
-from fastapi import FastAPI, HTTPException, Depends, BackgroundTasks
+from fastapi import FastAPI, HTTPException, Depends, BackgroundTasks, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
 from datetime import datetime, timedelta
+import hashlib
 import json
 import threading
 import time
@@ -19,12 +20,36 @@ from strategies.funding_rate_arbitrage import FundingRateMonitor
 # 内联数据读取功能，不再依赖data模块
 from config.settings import settings
 from utils.notifier import send_telegram_message, send_email_notification
+from utils.binance_funding import load_full_cache, iter_cached_contracts, atomic_write_json
+from utils.logger import setup_logger
+
+# utils 下各模块通过 get_logger(__name__) 记录日志，在入口处为其父日志器挂上控制台输出
+setup_logger("utils", level=settings.LOG_LEVEL)
 
 # 在文件顶部导入os
 import os
 
+# 标准结算周期（小时），键为 round(小时数 * 10)
+STANDARD_FUNDING_INTERVALS = {10: 1.0, 20: 2.0, 40: 4.0, 80: 8.0, 120: 12.0, 240: 24.0}
+
 app = FastAPI(title="加密货币资金费率监控系统", version="1.0.0")
 
+def etag_response(request: Request, payload: dict):
+    """
+    按响应内容(不含每次都变化的timestamp)计算ETag，客户端If-None-Match命中时返回空的304响应
+
+    内容只序列化一次：对序列化结果计算哈希，再把timestamp拼接到末尾作为响应体
+    """
+    content = {k: v for k, v in payload.items() if k != "timestamp"}
+    body = json.dumps(content, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+    etag = f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    if "timestamp" in payload:
+        timestamp = json.dumps(payload["timestamp"], default=str).encode("utf-8")
+        body = body[:-1] + (b',' if content else b'') + b'"timestamp":' + timestamp + b'}'
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
+
 # 异步任务管理器
 class AsyncTaskManager:
     def __init__(self):
@@ -144,16 +169,10 @@ def get_symbols():
         # 内联数据读取功能
         symbols = []
         try:
-            cache_file = "cache/all_funding_contracts_full.json"
-            if os.path.exists(cache_file):
-                with open(cache_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    # 从全量缓存中获取所有合约
-                    contracts_by_interval = data.get('contracts_by_interval', {})
-                    all_contracts = {}
-                    for interval, contracts in contracts_by_interval.items():
-                        all_contracts.update(contracts)
-                    symbols = list(all_contracts.keys())
+            data = load_full_cache()
+            if data is not None:
+                # 从全量缓存中获取所有合约
+                symbols = list(dict(iter_cached_contracts(data)))
         except Exception as e:
             print(f"读取缓存文件失败: {e}")
         
@@ -247,34 +266,32 @@ def refresh_funding_candidates():
         filtered_contracts = {}
         contracts_by_interval = {}  # 按结算周期分组存储
         
+        # 使用现有的专业方法检测结算周期（客户端在循环外创建一次）
+        from utils.binance_funding import BinanceFunding
+        funding = BinanceFunding()
+        
+        # premiumIndex 也会返回交割合约，先按永续合约集合过滤，避免为它们逐个请求历史费率
+        try:
+            perpetual_set = frozenset(funding.get_perpetual_symbols("UM"))
+        except Exception as e:
+            # 获取失败时不过滤，退回到逐个检测结算周期的旧逻辑
+            print(f"⚠️ 获取永续合约列表失败，跳过永续合约过滤: {e}")
+            perpetual_set = frozenset()
+        
         for symbol, funding_info in funding_rates.items():
+            if perpetual_set and symbol not in perpetual_set:
+                continue
             try:
                 funding_rate = float(funding_info.get('lastFundingRate', 0))
                 volume_24h = volumes.get(symbol, 0)
                 
-                # 使用现有的专业方法检测结算周期
-                from utils.binance_funding import BinanceFunding
-                funding = BinanceFunding()
                 funding_interval_hours = funding.detect_funding_interval(symbol, "UM")
                 
                 if funding_interval_hours:
-                    # 将结算周期分类到最接近的标准间隔
-                    if abs(funding_interval_hours - 1.0) < 0.1:
-                        funding_interval_hours = 1.0
-                    elif abs(funding_interval_hours - 8.0) < 0.1:
-                        funding_interval_hours = 8.0
-                    elif abs(funding_interval_hours - 4.0) < 0.1:
-                        funding_interval_hours = 4.0
-                    elif abs(funding_interval_hours - 2.0) < 0.1:
-                        funding_interval_hours = 2.0
-                    elif abs(funding_interval_hours - 12.0) < 0.1:
-                        funding_interval_hours = 12.0
-                    elif abs(funding_interval_hours - 24.0) < 0.1:
-                        funding_interval_hours = 24.0
-                    else:
-                        # 其他间隔，按小时四舍五入
-                        funding_interval_hours = round(funding_interval_hours)
-                    
+                    # 将结算周期分类到最接近的标准间隔，其他间隔按小时四舍五入
+                    funding_interval_hours = STANDARD_FUNDING_INTERVALS.get(
+                        round(funding_interval_hours * 10), round(funding_interval_hours)
+                    )
                 else:
                     continue  # 直接跳过无法检测结算周期的合约
                 
@@ -332,14 +349,14 @@ def refresh_funding_candidates():
         # 保存到统一的缓存文件
         main_cache_data = {
             'cache_time': datetime.now().isoformat(),
+            'cache_time_epoch': time.time(),
             'contracts_by_interval': contracts_by_interval,
             'total_scanned': len(funding_rates),
             'intervals_found': intervals_found,
             'monitor_pool': filtered_contracts  # 添加监控合约池
         }
         
-        with open("cache/all_funding_contracts_full.json", 'w', encoding='utf-8') as f:
-            json.dump(main_cache_data, f, ensure_ascii=False, indent=2)
+        atomic_write_json("cache/all_funding_contracts_full.json", main_cache_data)
         
         print(f"✅ 监控合约池更新完成，共 {len(filtered_contracts)} 个符合条件合约，总计 {total_contracts} 个合约")
         
@@ -370,16 +387,13 @@ def refresh_funding_candidates():
 
 
 @app.get("/funding_monitor/pool")
-def get_funding_pool():
+def get_funding_pool(request: Request):
     """获取当前监控合约池"""
     try:
-        # 从统一缓存文件读取数据
-        cache_file = "cache/all_funding_contracts_full.json"
-        if os.path.exists(cache_file):
-            with open(cache_file, 'r', encoding='utf-8') as f:
-                cached_data = json.load(f)
-            
-                    # 直接从缓存中获取监控合约池
+        # 从统一缓存文件读取数据（共享的已解析结果，只读使用）
+        cached_data = load_full_cache() or {}
+        
+        # 直接从缓存中获取监控合约池
         monitor_pool = cached_data.get('monitor_pool', {})
         
         # 如果没有监控合约池，直接返回空结果
@@ -410,12 +424,12 @@ def get_funding_pool():
                 print(f"⚠️ 处理合约 {symbol} 时出错: {e}")
                 continue
         
-        return {
+        return etag_response(request, {
             "status": "success",
             "contracts": contracts_list,
             "count": len(contracts_list),
             "timestamp": datetime.now().isoformat()
-        }
+        })
 
     except Exception as e:
         print(f"获取合约池异常: {e}\n{traceback.format_exc()}")
@@ -426,17 +440,10 @@ def get_funding_candidates():
     """获取备选合约池"""
     try:
         # 从统一缓存文件读取数据
-        cache_file = "cache/all_funding_contracts_full.json"
-        if os.path.exists(cache_file):
-            with open(cache_file, 'r', encoding='utf-8') as f:
-                cached_data = json.load(f)
-            
+        cached_data = load_full_cache()
+        if cached_data is not None:
             # 从统一缓存中获取所有合约作为备选
-            all_contracts = {}
-            contracts_by_interval = cached_data.get('contracts_by_interval', {})
-            
-            for interval, contracts in contracts_by_interval.items():
-                all_contracts.update(contracts)
+            all_contracts = dict(iter_cached_contracts(cached_data))
             
             return {
                 "status": "success",
@@ -718,11 +725,10 @@ def _execute_latest_rates_task(fast_mode: bool = False, cache_only: bool = False
         # 优先处理监控池中的合约
         monitor_pool_symbols = set()
         try:
-            with open("cache/all_funding_contracts_full.json", 'r', encoding='utf-8') as f:
-                cache_data = json.load(f)
-                monitor_pool = cache_data.get('monitor_pool', {})
-                monitor_pool_symbols = set(monitor_pool.keys())
-                print(f"🎯 监控池合约数: {len(monitor_pool_symbols)}")
+            cache_data = load_full_cache() or {}
+            monitor_pool = cache_data.get('monitor_pool', {})
+            monitor_pool_symbols = set(monitor_pool.keys())
+            print(f"🎯 监控池合约数: {len(monitor_pool_symbols)}")
         except Exception as e:
             print(f"⚠️ 读取监控池失败: {e}")
         
@@ -1040,11 +1046,10 @@ def get_latest_funding_rates(fast_mode: bool = False, cache_only: bool = False):
         # 优先处理监控池中的合约
         monitor_pool_symbols = set()
         try:
-            with open("cache/all_funding_contracts_full.json", 'r', encoding='utf-8') as f:
-                cache_data = json.load(f)
-                monitor_pool = cache_data.get('monitor_pool', {})
-                monitor_pool_symbols = set(monitor_pool.keys())
-                print(f"🎯 监控池合约数: {len(monitor_pool_symbols)}")
+            cache_data = load_full_cache() or {}
+            monitor_pool = cache_data.get('monitor_pool', {})
+            monitor_pool_symbols = set(monitor_pool.keys())
+            print(f"🎯 监控池合约数: {len(monitor_pool_symbols)}")
         except Exception as e:
             print(f"⚠️ 读取监控池失败: {e}")
         
@@ -1287,12 +1292,9 @@ def get_latest_funding_rates(fast_mode: bool = False, cache_only: bool = False):
         # 从缓存中获取成交量数据
         volume_data = {}
         try:
-            with open("cache/all_funding_contracts_full.json", 'r', encoding='utf-8') as f:
-                cache_data = json.load(f)
-                contracts_by_interval = cache_data.get('contracts_by_interval', {})
-                for interval, contracts in contracts_by_interval.items():
-                    for symbol, info in contracts.items():
-                        volume_data[symbol] = info.get('volume_24h', 0)
+            cache_data = load_full_cache() or {}
+            contracts_by_interval = cache_data.get('contracts_by_interval', {})
+            volume_data = {symbol: info.get('volume_24h', 0) for symbol, info in iter_cached_contracts(cache_data)}
         except Exception as e:
             print(f"⚠️ 读取成交量数据失败: {e}")
         
@@ -1373,6 +1375,7 @@ def get_latest_funding_rates(fast_mode: bool = False, cache_only: bool = False):
         # 更新缓存文件，添加最新资金费率数据和新的监控池
         updated_cache_data = {
             'cache_time': datetime.now().isoformat(),
+            'cache_time_epoch': time.time(),
             'contracts_by_interval': contracts_by_interval,
             'latest_rates': latest_rates,
             'monitor_pool': new_monitor_pool,
@@ -1388,8 +1391,7 @@ def get_latest_funding_rates(fast_mode: bool = False, cache_only: bool = False):
         }
         
         # 保存更新后的缓存
-        with open("cache/all_funding_contracts_full.json", 'w', encoding='utf-8') as f:
-            json.dump(updated_cache_data, f, ensure_ascii=False, indent=2)
+        atomic_write_json("cache/all_funding_contracts_full.json", updated_cache_data)
         
         print(f"✅ 监控池更新完成: 新增 {len(added_contracts)} 个，移除 {len(removed_contracts)} 个，当前池内 {len(new_monitor_pool)} 个")
         
@@ -1472,8 +1474,7 @@ def save_monitor_history_data(latest_rates):
                         "history": [history_record]
                     }
                 
-                with open(contract_file, 'w', encoding='utf-8') as f:
-                    json.dump(existing_data, f, ensure_ascii=False, indent=2)
+                atomic_write_json(contract_file, existing_data)
         
         print(f"✅ 监控合约历史数据已保存（按合约分文件）")
         
@@ -1614,10 +1615,11 @@ def get_monitor_contract_history(symbol: str, days: int = 7):
                 contract_data = json.load(f)
                 history_data = contract_data.get('history', [])
                 
-                # 如果需要按天数过滤，可以在这里添加过滤逻辑
-                if days < 7:  # 如果请求的天数少于7天，可以过滤最近的数据
-                    # 这里可以根据需要实现按天数过滤的逻辑
-                    pass
+                # 请求的天数少于7天时只保留时间窗口内的记录，先过滤再排序
+                if days < 7:
+                    # 记录时间戳均为isoformat字符串，可直接按字典序比较
+                    since = (datetime.now() - timedelta(days=days)).isoformat()
+                    history_data = [r for r in history_data if r.get('timestamp', '') >= since]
                 
                 # 按时间排序（最新的在前）
                 history_data.sort(key=lambda x: x['timestamp'], reverse=True)
@@ -1776,7 +1778,7 @@ def get_monitor_config():
     except Exception as e:
         print(f"获取监控配置异常: {e}\n{traceback.format_exc()}")
 @app.get("/funding_monitor/history-contracts")
-def get_history_contracts():
+def get_history_contracts(request: Request):
     """获取历史入池合约列表"""
     try:
         import os
@@ -1869,19 +1871,19 @@ def get_history_contracts():
         # 按创建时间排序（最新的在前）
         history_files.sort(key=lambda x: x['created_time'], reverse=True)
         
-        return {
+        return etag_response(request, {
             "status": "success",
             "contracts": history_files,
             "count": len(history_files),
             "timestamp": datetime.now().isoformat()
-        }
+        })
         
     except Exception as e:
         print(f"获取历史合约列表异常: {e}\n{traceback.format_exc()}")
         raise HTTPException(status_code=500, detail=f"获取历史合约列表失败: {str(e)}")
 
 @app.get("/funding_monitor/history-contract/{symbol}")
-def get_history_contract_detail(symbol: str):
+def get_history_contract_detail(symbol: str, request: Request):
     """获取指定合约的历史详情"""
     try:
         import os
@@ -1905,14 +1907,14 @@ def get_history_contract_detail(symbol: str):
             # 按时间排序（最新的在前）
             history_records.sort(key=lambda x: x.get('timestamp', ''), reverse=True)
             
-            return {
+            return etag_response(request, {
                 "status": "success",
                 "symbol": symbol_name,
                 "history": history_records,
                 "total_records": len(history_records),
                 "created_time": created_time,
                 "timestamp": datetime.now().isoformat()
-            }
+            })
             
         except Exception as e:
             print(f"⚠️ 读取合约历史文件 {contract_file} 失败: {e}")
@@ -25,6 +25,7 @@ from config.settings import settings
 from strategies.factory import StrategyFactory
 from api.routes import app
 from utils.notifier import send_telegram_message, send_email_notification
+from utils.logger import setup_logger
 
 # 导入新的监控策略
 from strategies.funding_rate_arbitrage import FundingRateMonitor
@@ -149,6 +150,9 @@ def setup_logging():
         rotation="1 day",
         retention="30 days"
     )
+    
+    # utils 下的模块使用标准库 logging，同样输出到控制台
+    setup_logger("utils", level=settings.LOG_LEVEL)
 
 def test_data_connection():
     """测试数据连接"""
@@ -5,7 +5,7 @@ from typing import Dict, Set, Optional, List, Tuple
 from datetime import datetime, timedelta
 from .base import BaseStrategy
 from utils.notifier import send_telegram_message
-from utils.email_sender import send_funding_rate_warning_email, send_pool_change_email
+from utils.email_sender import queue_email
 from config.proxy_settings import get_proxy_dict, get_ccxt_proxy_config, test_proxy_connection
 import threading
 import schedule
@@ -324,11 +324,10 @@ class FundingRateMonitor(BaseStrategy):
                     # 发送邮件通知
                     if removed_contracts_info:
                         print(f"📧 准备发送出池邮件通知: {removed_contracts_info}")
-                        email_success = send_pool_change_email([], removed_contracts_info)
-                        if email_success:
-                            print(f"✅ 出池邮件通知发送成功")
+                        if queue_email('send_pool_change_notification', [], removed_contracts_info):
+                            print(f"✅ 出池邮件通知已加入发送队列")
                         else:
-                            print(f"❌ 出池邮件通知发送失败")
+                            print(f"❌ 出池邮件通知加入发送队列失败")
                 else:
                     print(f"⚠️ 首次刷新，跳过出池通知")
             
@@ -373,11 +372,10 @@ class FundingRateMonitor(BaseStrategy):
                     # 发送邮件通知
                     if added_contracts_info:
                         print(f"📧 准备发送入池邮件通知: {added_contracts_info}")
-                        email_success = send_pool_change_email(added_contracts_info, [])
-                        if email_success:
-                            print(f"✅ 入池邮件通知发送成功")
+                        if queue_email('send_pool_change_notification', added_contracts_info, []):
+                            print(f"✅ 入池邮件通知已加入发送队列")
                         else:
-                            print(f"❌ 入池邮件通知发送失败")
+                            print(f"❌ 入池邮件通知加入发送队列失败")
                 else:
                     print(f"⚠️ 首次刷新，跳过入池通知")
             
@@ -490,9 +488,8 @@ class FundingRateMonitor(BaseStrategy):
             
             cache_time = cache_data.get('cache_time', '')
             if cache_time:
-                from datetime import datetime
-                cache_datetime = datetime.fromisoformat(cache_time)
-                cache_age = (datetime.now() - cache_datetime).total_seconds()
+                from utils.binance_funding import cache_age_seconds
+                cache_age = cache_age_seconds(cache_data)
                 
                 contracts_count = 0
                 contracts_by_interval = cache_data.get('contracts_by_interval', {})
@@ -574,7 +571,7 @@ class FundingRateMonitor(BaseStrategy):
     def _send_funding_rate_warnings(self):
         """发送资金费率警告邮件"""
         try:
-            warning_count = 0
+            queued_count = 0
             threshold = self.parameters['funding_rate_threshold']
             
             for symbol, info in self.cached_contracts.items():
@@ -587,7 +584,8 @@ class FundingRateMonitor(BaseStrategy):
                         volume_24h = float(info.get('volume_24h', 0))
                         next_funding_time = info.get('next_funding_time', '未知')
                         
-                        success = send_funding_rate_warning_email(
+                        success = queue_email(
+                            'send_funding_rate_warning',
                             symbol=symbol,
                             funding_rate=float(info.get('current_funding_rate', 0)),
                             mark_price=mark_price,
@@ -596,17 +594,18 @@ class FundingRateMonitor(BaseStrategy):
                         )
                         
                         if success:
-                            warning_count += 1
-                            print(f"📧 已发送资金费率警告邮件: {symbol} ({funding_rate:.4%})")
+                            queued_count += 1
+                            print(f"📧 资金费率警告邮件已加入发送队列: {symbol} ({funding_rate:.4%})")
                         else:
-                            print(f"⚠️ 发送资金费率警告邮件失败: {symbol}")
+                            print(f"⚠️ 资金费率警告邮件加入发送队列失败: {symbol}")
                             
                 except (ValueError, TypeError) as e:
                     print(f"⚠️ 处理合约 {symbol} 数据时出错: {e}")
                     continue
             
-            if warning_count > 0:
-                print(f"📧 本次检查发送了 {warning_count} 个资金费率警告邮件")
+            if queued_count > 0:
+                # 邮件由后台线程发送，发送失败会在邮件模块日志中记录
+                print(f"📧 本次检查有 {queued_count} 个资金费率警告邮件加入发送队列")
             else:
                 print("✅ 所有合约资金费率都在正常范围内")
                 
@@ -3,6 +3,13 @@
 包含数据库、模型等通用工具
 """
 
+# 禁用urllib3的SSL警告（整个utils包只在此处执行一次）
+try:
+    import urllib3
+    urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+except ImportError:
+    pass
+
 # 数据库相关导入已移除
 # 数据库模型已移除
 
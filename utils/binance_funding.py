@@ -3,43 +3,197 @@
 币安资金费率统一工具（基于 binance_interface）
 """
 import time
+import threading
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Dict, List, Optional, Any
 import os
 import json
 import requests
-import urllib3
+from utils.logger import get_logger
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = get_logger(__name__)
 
-# 禁用urllib3的SSL警告
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 """
-注意: 为了提升在不同 Python 版本/环境下的可用性，本模块避免在导入阶段强依赖 pandas。
-涉及 CSV 缓存的读写仅在运行到相应函数时尝试按需导入 pandas；
-当环境缺失 pandas 时，将跳过缓存读写或返回空数据，以保证核心扫描与监控功能可用。
+注意: 本模块不依赖 pandas。历史资金费率按需从API获取，不做本地 CSV/Parquet 缓存；
+所有本地缓存均为 cache/ 目录下的 JSON 文件。
 """
 
+def _json_loads(data: bytes):
+    """解析JSON字节串，优先使用orjson"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data.decode('utf-8'))
+
+
+def _json_dumps(obj, indent: bool = True) -> bytes:
+    """序列化为UTF-8编码的JSON字节串，优先使用orjson"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(obj, ensure_ascii=False, indent=2 if indent else None).encode('utf-8')
+
+
+def atomic_write_json(path: str, obj, indent: bool = False):
+    """先写临时文件再替换，读取方不会看到写了一半的JSON
+    
+    缓存文件只供程序读取，默认不缩进以减少写入和解析的字节数
+    """
+    buf = _json_dumps(obj, indent)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(buf)
+    os.replace(tmp_path, path)
+
+
+# binance_interface 客户端全局共享，首次使用时才导入并创建
+_UM_SINGLETON = None
+_CM_SINGLETON = None
+_HTTP_SESSION = None
+_client_lock = threading.Lock()
+
+
+def _get_um():
+    """获取共享的U本位合约客户端"""
+    global _UM_SINGLETON
+    if _UM_SINGLETON is None:
+        with _client_lock:
+            if _UM_SINGLETON is None:
+                from binance_interface.api import UM
+                _UM_SINGLETON = UM()
+    return _UM_SINGLETON
+
+
+def _get_cm():
+    """获取共享的币本位合约客户端"""
+    global _CM_SINGLETON
+    if _CM_SINGLETON is None:
+        with _client_lock:
+            if _CM_SINGLETON is None:
+                from binance_interface.api import CM
+                _CM_SINGLETON = CM()
+    return _CM_SINGLETON
+
+
+def _get_http_session() -> requests.Session:
+    """获取共享的HTTP会话，批量行情接口复用TCP/TLS连接"""
+    global _HTTP_SESSION
+    if _HTTP_SESSION is None:
+        with _client_lock:
+            if _HTTP_SESSION is None:
+                from requests.adapters import HTTPAdapter
+                session = requests.Session()
+                # 证书校验在会话上统一关闭（对应模块顶部已屏蔽的InsecureRequestWarning）
+                session.verify = False
+                adapter = HTTPAdapter(pool_connections=20, pool_maxsize=20)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _HTTP_SESSION = session
+    return _HTTP_SESSION
+
+
+FULL_CACHE_FILE = "cache/all_funding_contracts_full.json"
+
+# 结算周期分档：不超过 1.5/3/6 小时分别归为 1h/2h/4h，其余归为 8h
+_INTERVAL_UPPER_BOUNDS = (1.5, 3, 6)
+_INTERVAL_KEYS = ("1h", "2h", "4h", "8h")
+
+# 全量扫描的并发线程数，以及所有线程合计相邻两个合约开始扫描的最小间隔（秒），
+# 与原先顺序扫描每个合约后等待0.1秒的请求速率保持一致
+SCAN_MAX_WORKERS = 4
+SCAN_MIN_INTERVAL = 0.1
+
+
+class _RateLimiter:
+    """多线程共享的限速器：相邻两次放行至少间隔 interval 秒"""
+    
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+    
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+_SCAN_RATE_LIMITER = _RateLimiter(SCAN_MIN_INTERVAL)
+
+
+# 全量缓存的解析结果，键为 (mtime_ns, size)，文件未变化时直接复用
+_FULL_CACHE_MEMO = {}
+
+
+def load_full_cache() -> Optional[dict]:
+    """读取全量合约缓存文件，文件不存在时返回None
+    
+    文件未被改写时返回同一个已解析的dict，调用方只读使用，不要原地修改
+    """
+    try:
+        st = os.stat(FULL_CACHE_FILE)
+    except FileNotFoundError:
+        return None
+    key = (st.st_mtime_ns, st.st_size)
+    cached = _FULL_CACHE_MEMO.get(key)
+    if cached is not None:
+        return cached
+    with open(FULL_CACHE_FILE, 'rb') as f:
+        data = _json_loads(f.read())
+    _FULL_CACHE_MEMO.clear()
+    _FULL_CACHE_MEMO[key] = data
+    return data
+
+
+def cache_age_seconds(cache_data: dict) -> float:
+    """计算缓存已存在的秒数，优先使用 cache_time_epoch，旧缓存回退到解析 cache_time"""
+    epoch = cache_data.get('cache_time_epoch')
+    if epoch is None:
+        epoch = datetime.fromisoformat(cache_data.get('cache_time', '2000-01-01')).timestamp()
+    return time.time() - epoch
+
+
+def iter_cached_contracts(cache_data: dict):
+    """遍历全量缓存中所有结算周期的合约，逐个产出 (symbol, info)"""
+    for contracts in cache_data.get('contracts_by_interval', {}).values():
+        yield from contracts.items()
+
+
 class BinanceFunding:
     def __init__(self):
         try:
-            from binance_interface.api import UM, CM
-            self.um = UM()
-            self.cm = CM()
+            self.um = _get_um()
             self.available = True
         except ImportError:
             print("❌ binance_interface 未安装，请先 pip install binance-interface")
             self.available = False
 
+    @property
+    def cm(self):
+        """币本位客户端按需创建（大多数调用只用到U本位）"""
+        return _get_cm()
+
     def _parse_single(self, data: Any) -> dict:
         """自动从dict或list[dict]中取第一个dict"""
-        if isinstance(data, dict):
+        # 单合约查询几乎总是返回dict，用精确类型判断走快速路径
+        t = type(data)
+        if t is dict:
             return data
-        if isinstance(data, list) and data:
+        if t is list and data:
             return data[0]
         return {}
 
     def get_current_funding(self, symbol: str, contract_type: str = "UM") -> Optional[dict]:
         if not self.available:
-            print(f"❌ {symbol}: binance_interface 未安装或不可用")
+            logger.debug("❌ %s: binance_interface 未安装或不可用", symbol)
             return None
         try:
             if contract_type == "UM":
@@ -49,56 +203,59 @@ class BinanceFunding:
                 
             # 添加详细的调试信息
             if not res:
-                print(f"⚠️ {symbol}: API返回空响应，跳过当前资金费率获取")
+                logger.debug("⚠️ %s: API返回空响应，跳过当前资金费率获取", symbol)
                 return None
             
             if not isinstance(res, dict):
-                print(f"⚠️ {symbol}: API响应格式异常 (类型: {type(res)})，跳过当前资金费率获取")
+                logger.debug("⚠️ %s: API响应格式异常 (类型: %s)，跳过当前资金费率获取", symbol, type(res))
                 return None
             
             if res.get('code') != 200:
-                print(f"⚠️ {symbol}: API响应错误 (code: {res.get('code')}, msg: {res.get('msg', 'unknown')})，跳过当前资金费率获取")
+                logger.debug("⚠️ %s: API响应错误 (code: %s, msg: %s)，跳过当前资金费率获取", symbol, res.get('code'), res.get('msg', 'unknown'))
                 return None
             
             data_list = res.get('data', [])
             if not data_list:
-                print(f"⚠️ {symbol}: API返回空数据，跳过当前资金费率获取")
+                logger.debug("⚠️ %s: API返回空数据，跳过当前资金费率获取", symbol)
                 return None
             
-            data = self._parse_single(data_list)
-            funding_rate = data.get('lastFundingRate', 0)
-            mark_price = data.get('markPrice', 0)
-            next_time = data.get('nextFundingTime')
-            
-            # 确保funding_rate是数值类型
-            try:
-                funding_rate = float(funding_rate) if funding_rate is not None else 0.0
-            except (ValueError, TypeError):
-                funding_rate = 0.0
-            
-            # 确保mark_price是数值类型
-            try:
-                mark_price = float(mark_price) if mark_price is not None else 0.0
-            except (ValueError, TypeError):
-                mark_price = 0.0
-            
-            result = {
-                'symbol': data.get('symbol', symbol),
-                'funding_rate': funding_rate,
-                'next_funding_time': next_time,
-                'mark_price': mark_price,
-                'index_price': data.get('indexPrice'),
-                'raw': data
-            }
-            
-            return result
+            return self._format_premium_index(self._parse_single(data_list), symbol)
         except Exception as e:
-            print(f"⚠️ {symbol}: API调用异常 ({type(e).__name__}: {e})，跳过当前资金费率获取")
+            logger.debug("⚠️ %s: API调用异常 (%s: %s)，跳过当前资金费率获取", symbol, type(e).__name__, e)
             return None
 
+    def _format_premium_index(self, data: dict, symbol: str) -> dict:
+        """将premiumIndex原始数据整理为统一的资金费率信息"""
+        funding_rate = data.get('lastFundingRate', 0)
+        mark_price = data.get('markPrice', 0)
+        next_time = data.get('nextFundingTime')
+        
+        # 确保funding_rate是数值类型
+        try:
+            funding_rate = float(funding_rate) if funding_rate is not None else 0.0
+        except (ValueError, TypeError):
+            funding_rate = 0.0
+        
+        # 确保mark_price是数值类型
+        try:
+            mark_price = float(mark_price) if mark_price is not None else 0.0
+        except (ValueError, TypeError):
+            mark_price = 0.0
+        
+        result = {
+            'symbol': data.get('symbol', symbol),
+            'funding_rate': funding_rate,
+            'next_funding_time': next_time,
+            'mark_price': mark_price,
+            'index_price': data.get('indexPrice'),
+            'raw': data
+        }
+        
+        return result
+
     def get_funding_history(self, symbol: str, contract_type: str = "UM", limit: int = 10) -> List[dict]:
         if not self.available:
-            print(f"⚠️ {symbol}: binance_interface 未安装或不可用，跳过历史资金费率获取")
+            logger.debug("⚠️ %s: binance_interface 未安装或不可用，跳过历史资金费率获取", symbol)
             return []
         try:
             if contract_type == "UM":
@@ -108,20 +265,20 @@ class BinanceFunding:
             
             # 添加详细的调试信息
             if not res:
-                print(f"⚠️ {symbol}: API返回空响应，跳过历史资金费率获取")
+                logger.debug("⚠️ %s: API返回空响应，跳过历史资金费率获取", symbol)
                 return []
             
             if not isinstance(res, dict):
-                print(f"⚠️ {symbol}: API响应格式异常 (类型: {type(res)})，跳过历史资金费率获取")
+                logger.debug("⚠️ %s: API响应格式异常 (类型: %s)，跳过历史资金费率获取", symbol, type(res))
                 return []
             
             if res.get('code') != 200:
-                print(f"⚠️ {symbol}: API响应错误 (code: {res.get('code')}, msg: {res.get('msg', 'unknown')})，跳过历史资金费率获取")
+                logger.debug("⚠️ %s: API响应错误 (code: %s, msg: %s)，跳过历史资金费率获取", symbol, res.get('code'), res.get('msg', 'unknown'))
                 return []
             
             data = res.get('data', [])
             if not data:
-                print(f"⚠️ {symbol}: API返回空数据，跳过历史资金费率获取")
+                logger.debug("⚠️ %s: API返回空数据，跳过历史资金费率获取", symbol)
                 return []
             
             return [
@@ -134,7 +291,7 @@ class BinanceFunding:
                 } for d in data
             ]
         except Exception as e:
-            print(f"⚠️ {symbol}: 获取历史资金费率失败 ({type(e).__name__}: {e})，跳过历史资金费率获取")
+            logger.debug("⚠️ %s: 获取历史资金费率失败 (%s: %s)，跳过历史资金费率获取", symbol, type(e).__name__, e)
             return []
 
     def detect_funding_interval(self, symbol: str, contract_type: str = "UM") -> Optional[float]:
@@ -155,7 +312,7 @@ class BinanceFunding:
         return None
 
     def get_24h_volume(self, symbol: str, contract_type: str = "UM") -> float:
-        """获取24小时成交量"""
+        """获取24小时成交量（USDT计价的quoteVolume，与批量接口 get_all_24h_volumes 口径一致）"""
         if not self.available:
             return 0.0
         try:
@@ -165,10 +322,11 @@ class BinanceFunding:
                 res = self.cm.market.get_ticker_24hr(symbol=symbol)
             if res and res.get('code') == 200:
                 data = self._parse_single(res['data'])
-                return float(data.get('volume', 0))
+                # 币本位合约的行情没有quoteVolume，仍使用volume
+                return float(data.get('quoteVolume', data.get('volume', 0)))
             return 0.0
         except Exception as e:
-            print(f"❌ 获取24小时成交量失败: {e}")
+            logger.debug("❌ %s: 获取24小时成交量失败: %s", symbol, e)
             return 0.0
 
     def get_comprehensive_info(self, symbol: str, contract_type: str = "UM") -> dict:
@@ -201,168 +359,187 @@ class BinanceFunding:
                 'last_updated': datetime.now().isoformat()
             }
         except Exception as e:
-            print(f"❌ 获取合约综合信息失败: {e}")
+            logger.warning("❌ %s: 获取合约综合信息失败: %s", symbol, e)
             return {}
 
+    def _scan_symbol(self, symbol: str, contract_type: str, now_iso: str,
+                     premium_map: Optional[dict] = None, volume_map: Optional[dict] = None):
+        """扫描单个合约，返回 (结算周期, 合约信息, 最新资金费率)，失败返回None
+        
+        premium_map/volume_map 为批量接口预取的数据，命中时不再逐个请求
+        """
+        # 限流控制（所有扫描线程共用一个限速器，总请求速率不随线程数增加）
+        _SCAN_RATE_LIMITER.wait()
+        try:
+            # 获取资金费率信息
+            if premium_map and symbol in premium_map:
+                funding_info = self._format_premium_index(premium_map[symbol], symbol)
+            else:
+                funding_info = self.get_current_funding(symbol, contract_type)
+            if not funding_info:
+                return None
+            
+            # 获取24小时成交量
+            if volume_map and symbol in volume_map:
+                volume_info = volume_map[symbol]
+            else:
+                volume_info = self.get_24h_volume(symbol, contract_type)
+            
+            # 检测结算周期
+            funding_interval = self.detect_funding_interval(symbol, contract_type)
+            if funding_interval:
+                # 基于检测到的结算周期进行分类
+                interval_key = _INTERVAL_KEYS[bisect_left(_INTERVAL_UPPER_BOUNDS, funding_interval)]
+            else:
+                # 如果无法检测到，使用默认值
+                interval_key = "8h"
+            
+            # 构建合约信息
+            contract_info = {
+                'symbol': symbol,
+                'contract_type': contract_type,
+                'current_funding_rate': funding_info.get('funding_rate', 0),
+                'next_funding_time': funding_info.get('next_funding_time'),
+                'funding_interval_hours': funding_interval if funding_interval else 8.0,
+                'mark_price': funding_info.get('mark_price', 0),
+                'index_price': funding_info.get('raw', {}).get('indexPrice', 0),
+                'volume_24h': volume_info if volume_info else 0,
+                'last_updated': now_iso
+            }
+            latest_rate = {
+                "symbol": symbol,
+                "exchange": "binance",
+                "funding_rate": contract_info['current_funding_rate'],
+                "next_funding_time": contract_info['next_funding_time'],
+                "funding_interval": interval_key,
+                "mark_price": contract_info['mark_price'],
+                "index_price": funding_info.get('index_price'),
+                "last_updated": now_iso,
+                "data_source": "real_time"
+            }
+            
+            return interval_key, contract_info, latest_rate
+            
+        except Exception as e:
+            if "rate limit" in str(e).lower():
+                logger.debug("⚠️ %s: 限流，跳过", symbol)
+                time.sleep(2)
+            else:
+                logger.debug("❌ %s: 检测失败 - %s", symbol, e)
+            return None
+
+    def get_perpetual_symbols(self, contract_type: str = "UM", max_age: int = 6 * 3600) -> List[str]:
+        """获取永续合约列表，优先使用本地缓存（合约列表变化很少，默认6小时过期）"""
+        cache_file = os.path.join("cache", f"perpetual_symbols_{contract_type}.json")
+        if os.path.exists(cache_file):
+            try:
+                with open(cache_file, 'rb') as f:
+                    cached = _json_loads(f.read())
+                if time.time() - cached.get('last_modified', 0) < max_age and cached.get('symbols'):
+                    return cached['symbols']
+            except Exception as e:
+                logger.warning("⚠️ 读取永续合约列表缓存失败: %s", e)
+        
+        if contract_type == "UM":
+            res = self.um.market.get_exchangeInfo()
+        else:
+            res = self.cm.market.get_exchangeInfo()
+        
+        if not res or res.get('code') != 200:
+            return []
+        
+        symbols = [s['symbol'] for s in res['data']['symbols'] if s.get('contractType') == 'PERPETUAL']
+        
+        try:
+            os.makedirs("cache", exist_ok=True)
+            atomic_write_json(cache_file, {'last_modified': time.time(), 'symbols': symbols})
+        except Exception as e:
+            logger.warning("⚠️ 保存永续合约列表缓存失败: %s", e)
+        
+        return symbols
+
     def scan_all_funding_contracts(self, contract_type="UM", force_refresh=False):
         """扫描所有结算周期的合约并缓存"""
         cache_file = "cache/all_funding_contracts_full.json"
+        # 同一次扫描内的所有记录共用一个时间戳
+        now_iso = datetime.now().isoformat()
         
         # 检查缓存是否有效
         if not force_refresh and os.path.exists(cache_file):
             try:
-                with open(cache_file, 'r', encoding='utf-8') as f:
-                    cache_data = json.load(f)
+                with open(cache_file, 'rb') as f:
+                    cache_data = _json_loads(f.read())
                 
-                cache_time = datetime.fromisoformat(cache_data.get('cache_time', '2000-01-01'))
-                cache_age = (datetime.now() - cache_time).total_seconds()
+                cache_age = cache_age_seconds(cache_data)
+                # 任一结算周期已过了缓存中记录的最早下次结算时间，说明资金费率已经结算，需要重新扫描
+                now_ms = time.time() * 1000
+                settled = any(now_ms >= t for t in cache_data.get('expires_at', {}).values())
                 
-                # 缓存有效期：1小时
-                if cache_age < 3600:
+                # 缓存有效期：1小时，且期间没有发生结算
+                if cache_age < 3600 and not settled:
                     print(f"📋 缓存有效，使用现有数据 (缓存时间: {cache_age:.0f}秒前)")
                     return cache_data.get('contracts_by_interval', {})
+                elif settled:
+                    print("🔄 缓存中的合约已到结算时间，重新扫描...")
                 else:
                     print(f"🔄 缓存已过期 ({cache_age/3600:.2f}小时)，重新扫描...")
             except Exception as e:
-                print(f"⚠️ 读取缓存失败: {e}")
+                logger.warning("⚠️ 读取缓存失败: %s", e)
         
         print("🔍 开始扫描所有结算周期合约...")
         
         try:
             # 获取所有永续合约
-            if contract_type == "UM":
-                res = self.um.market.get_exchangeInfo()
-            else:
-                res = self.cm.market.get_exchangeInfo()
-            
-            if not res or res.get('code') != 200:
+            perpetual_symbols = self.get_perpetual_symbols(contract_type)
+            if not perpetual_symbols:
                 print("❌ 获取交易所信息失败")
                 return {}
             
-            perpetual_symbols = []
-            for symbol_info in res['data']['symbols']:
-                if symbol_info['contractType'] == 'PERPETUAL':
-                    perpetual_symbols.append(symbol_info['symbol'])
-            
             print(f"📊 发现 {len(perpetual_symbols)} 个永续合约")
             
-            # 按结算周期分组
+            # U本位合约的资金费率和成交量用批量接口一次取回，逐个合约只需再查结算周期
+            premium_map, volume_map = None, None
+            if contract_type == "UM":
+                try:
+                    premium_map = get_all_funding_rates()
+                    volume_map = get_all_24h_volumes()
+                except Exception as e:
+                    logger.warning("⚠️ 批量获取资金费率/成交量失败，改为逐个合约获取: %s", e)
+            
+            # 按结算周期分组，同时构建最新资金费率数据（单次遍历）
             contracts_by_interval = {}
+            latest_rates = {}
             
-            for i, symbol in enumerate(perpetual_symbols):
-                try:
-                    # 获取资金费率信息
-                    funding_info = self.get_current_funding(symbol, contract_type)
-                    if not funding_info:
+            # 单个合约的请求彼此独立且以网络等待为主，用少量线程并发扫描
+            with ThreadPoolExecutor(max_workers=SCAN_MAX_WORKERS) as executor:
+                results = executor.map(
+                    lambda symbol: self._scan_symbol(symbol, contract_type, now_iso, premium_map, volume_map),
+                    perpetual_symbols
+                )
+                for result in results:
+                    if not result:
                         continue
-                    
-                    # 获取24小时成交量
-                    volume_info = self.get_24h_volume(symbol, contract_type)
-                    
-                    # 检测结算周期
-                    funding_interval = self.detect_funding_interval(symbol, contract_type)
-                    if funding_interval:
-                        # 基于检测到的结算周期进行分类
-                        if funding_interval <= 1.5:
-                            interval_key = "1h"
-                        elif funding_interval <= 3:
-                            interval_key = "2h"
-                        elif funding_interval <= 6:
-                            interval_key = "4h"
-                        elif funding_interval <= 12:
-                            interval_key = "8h"
-                        else:
-                            interval_key = "8h"  # 默认
-                    else:
-                        # 如果无法检测到，使用默认值
-                        interval_key = "8h"
-                    
-                    # 构建合约信息
-                    contract_info = {
-                        'symbol': symbol,
-                        'contract_type': contract_type,
-                        'current_funding_rate': funding_info.get('funding_rate', 0),
-                        'next_funding_time': funding_info.get('next_funding_time'),
-                        'funding_interval_hours': funding_interval if funding_interval else 8.0,
-                        'mark_price': funding_info.get('mark_price', 0),
-                        'index_price': funding_info.get('raw', {}).get('indexPrice', 0),
-                        'volume_24h': volume_info if volume_info else 0,
-                        'last_updated': datetime.now().isoformat()
-                    }
+                    interval_key, contract_info, latest_rate = result
+                    symbol = contract_info['symbol']
+                    latest_rates[symbol] = latest_rate
                     
                     # 按结算周期分组
                     if interval_key not in contracts_by_interval:
                         contracts_by_interval[interval_key] = {}
                     contracts_by_interval[interval_key][symbol] = contract_info
-                    
-                    # 限流控制
-                    if (i + 1) % 50 == 0:
-                        time.sleep(1)
-                    else:
-                        time.sleep(0.1)
-                        
-                except Exception as e:
-                    if "rate limit" in str(e).lower():
-                        print(f"  ⚠️ {symbol}: 限流，跳过")
-                        time.sleep(2)
-                    else:
-                        print(f"  ❌ {symbol}: 检测失败 - {e}")
-                    continue
-            
-            # 获取并保存最新资金费率数据
-            latest_rates = {}
-            print("🔄 获取最新资金费率数据...")
             
+            # 各结算周期最早的下次结算时间（毫秒），到期后该周期的缓存即失效
+            expires_at = {}
             for interval_key, contracts in contracts_by_interval.items():
-                for symbol in contracts.keys():
-                    try:
-                        # 获取最新资金费率
-                        current_info = self.get_current_funding(symbol, contract_type)
-                        if current_info:
-                            latest_rates[symbol] = {
-                                "symbol": symbol,
-                                "exchange": "binance",
-                                "funding_rate": current_info.get('funding_rate', 0),
-                                "next_funding_time": current_info.get('next_funding_time'),
-                                "funding_interval": interval_key,
-                                "mark_price": current_info.get('mark_price', 0),
-                                "index_price": current_info.get('index_price'),
-                                "last_updated": datetime.now().isoformat(),
-                                "data_source": "real_time"
-                            }
-                        else:
-                            # 使用缓存数据
-                            cached_info = contracts[symbol]
-                            latest_rates[symbol] = {
-                                "symbol": symbol,
-                                "exchange": "binance",
-                                "funding_rate": cached_info.get('current_funding_rate', 0),
-                                "next_funding_time": cached_info.get('next_funding_time'),
-                                "funding_interval": interval_key,
-                                "mark_price": cached_info.get('mark_price', 0),
-                                "index_price": cached_info.get('index_price'),
-                                "last_updated": datetime.now().isoformat(),
-                                "data_source": "cached"
-                            }
-                    except Exception as e:
-                        print(f"    ⚠️ {symbol}: 获取最新资金费率失败: {e}")
-                        # 使用缓存数据
-                        cached_info = contracts[symbol]
-                        latest_rates[symbol] = {
-                            "symbol": symbol,
-                            "exchange": "binance",
-                            "funding_rate": cached_info.get('current_funding_rate', 0),
-                            "next_funding_time": cached_info.get('next_funding_time'),
-                            "funding_interval": interval_key,
-                            "mark_price": cached_info.get('mark_price', 0),
-                            "index_price": cached_info.get('index_price'),
-                            "last_updated": datetime.now().isoformat(),
-                            "data_source": "error_fallback"
-                        }
+                funding_times = [c['next_funding_time'] for c in contracts.values() if isinstance(c.get('next_funding_time'), int)]
+                if funding_times:
+                    expires_at[interval_key] = min(funding_times)
             
             # 保存全量缓存文件（包含最新资金费率）
             cache_data = {
                 'cache_time': datetime.now().isoformat(),
+                'cache_time_epoch': time.time(),
+                'expires_at': expires_at,
                 'contracts_by_interval': contracts_by_interval,
                 'latest_rates': latest_rates,
                 'total_scanned': len(perpetual_symbols),
@@ -370,8 +547,7 @@ class BinanceFunding:
             }
             
             os.makedirs("cache", exist_ok=True)
-            with open(cache_file, 'w', encoding='utf-8') as f:
-                json.dump(cache_data, f, ensure_ascii=False, indent=2)
+            atomic_write_json(cache_file, cache_data)
             
             print(f"✅ 扫描完成，共 {len(perpetual_symbols)} 个合约，{len(contracts_by_interval)} 个结算周期")
             
@@ -389,22 +565,19 @@ class BinanceFunding:
 
     def get_contracts_by_interval_from_cache(self, interval: str = "1h", tg_notifier=None):
         """从缓存获取指定结算周期的合约"""
-        cache_file = "cache/all_funding_contracts_full.json" # 使用全量缓存文件
         cache_duration = 3600  # 1小时缓存有效期
         
-        if os.path.exists(cache_file):
-            try:
-                with open(cache_file, 'r', encoding='utf-8') as f:
-                    cache_data = json.load(f)
-                
-                cache_time = datetime.fromisoformat(cache_data.get('cache_time', '2000-01-01'))
-                cache_age = (datetime.now() - cache_time).total_seconds()
+        try:
+            cache_data = load_full_cache()  # 使用全量缓存文件
+            if cache_data is not None:
+                cache_age = cache_age_seconds(cache_data)
                 
                 # 从全量缓存中获取指定结算周期的合约
                 contracts_by_interval = cache_data.get('contracts_by_interval', {})
                 target_contracts = contracts_by_interval.get(interval, {})
                 
-                # 检查缓存是否过期
+                # 检查缓存是否过期（按结算时间触发的重新扫描由 scan_all_funding_contracts 负责，
+                # 这里只在缓存长时间未更新时告警）
                 if cache_age > cache_duration:
                     msg = f"⚠️ 全量合约缓存已过期 {cache_age/3600:.2f} 小时，定时任务可能未正常更新！"
                     print(msg)
@@ -412,16 +585,16 @@ class BinanceFunding:
                         try:
                             tg_notifier(msg)
                         except Exception as e:
-                            print(f"❌ 发送Telegram通知失败: {e}")
+                            logger.warning("❌ 发送Telegram通知失败: %s", e)
                 
                 return target_contracts
-            except Exception as e:
-                print(f"⚠️ 读取全量缓存失败: {e}")
-                if tg_notifier:
-                    try:
-                        tg_notifier(f"❌ 读取全量合约缓存失败: {e}")
-                    except Exception as notify_e:
-                        print(f"❌ 发送Telegram通知失败: {notify_e}")
+        except Exception as e:
+            logger.warning("⚠️ 读取全量缓存失败: %s", e)
+            if tg_notifier:
+                try:
+                    tg_notifier(f"❌ 读取全量合约缓存失败: {e}")
+                except Exception as notify_e:
+                    logger.warning("❌ 发送Telegram通知失败: %s", notify_e)
         
         return {}
 
@@ -431,21 +604,17 @@ class BinanceFunding:
 
     def get_all_intervals_from_cache(self):
         """获取所有结算周期的合约缓存概览"""
-        cache_file = "cache/all_funding_contracts_full.json"
-        
-        if os.path.exists(cache_file):
-            try:
-                with open(cache_file, 'r', encoding='utf-8') as f:
-                    cache_data = json.load(f)
-                
+        try:
+            cache_data = load_full_cache()
+            if cache_data is not None:
                 return {
                     'cache_time': cache_data.get('cache_time'),
                     'intervals': cache_data.get('intervals_found', []),
                     'total_contracts': sum(len(contracts) for contracts in cache_data.get('contracts_by_interval', {}).values()),
                     'contracts_by_interval': cache_data.get('contracts_by_interval', {})
                 }
-            except Exception as e:
-                print(f"⚠️ 读取所有结算周期缓存失败: {e}")
+        except Exception as e:
+            logger.warning("⚠️ 读取所有结算周期缓存失败: %s", e)
         
         return {}
 
@@ -462,8 +631,7 @@ class BinanceFunding:
     def save_contracts(self, contracts: Dict[str, dict], filename: str = "1h_funding_contracts.json"):
         os.makedirs("cache", exist_ok=True)
         path = os.path.join("cache", filename)
-        with open(path, 'w', encoding='utf-8') as f:
-            json.dump(contracts, f, ensure_ascii=False, indent=2)
+        atomic_write_json(path, contracts)
         print(f"✅ 合约信息已保存到: {path}")
 
     def load_contracts(self, filename: str = "1h_funding_contracts.json") -> Dict[str, dict]:
@@ -471,8 +639,8 @@ class BinanceFunding:
         if not os.path.exists(path):
             print(f"⚠️ 文件不存在: {path}")
             return {}
-        with open(path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        with open(path, 'rb') as f:
+            return _json_loads(f.read())
 
 def get_all_funding_rates():
     """批量获取所有合约的资金费率等信息，返回symbol到资金费率等信息的映射"""
@@ -482,9 +650,9 @@ def get_all_funding_rates():
     proxies = get_proxy_dict()
     
     try:
-        resp = requests.get(url, proxies=proxies, timeout=30, verify=False)
+        resp = _get_http_session().get(url, proxies=proxies, timeout=30)
         resp.raise_for_status()
-        data = resp.json()
+        data = _json_loads(resp.content)
         # 构建symbol到资金费率等信息的映射
         data_map = {item['symbol']: item for item in data}
         return data_map
@@ -501,9 +669,9 @@ def get_all_24h_volumes():
     proxies = get_proxy_dict()
     
     try:
-        resp = requests.get(url, proxies=proxies, timeout=30, verify=False)
+        resp = _get_http_session().get(url, proxies=proxies, timeout=30)
         resp.raise_for_status()
-        data = resp.json()
+        data = _json_loads(resp.content)
         return {item['symbol']: float(item['quoteVolume']) for item in data}
     except Exception as e:
         print(f"❌ 获取24小时成交量失败: {e}")
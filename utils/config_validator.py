@@ -3,11 +3,50 @@
 配置验证工具
 """
 
+import re
+from functools import lru_cache
 from typing import Dict, List, Tuple, Any
 from config.settings import settings
 
+# Telegram Chat ID：可带负号（群组）的纯数字
+CHAT_ID_PATTERN = re.compile(r'-?\d+')
+
+# 资金费率相关数值配置的检查规则：(字段, 名称, 下限, 低于下限的提示, 上限, 超过上限的提示)
+FUNDING_RATE_RULES = (
+    ('FUNDING_RATE_THRESHOLD', "资金费率阈值", None, None, 0.1, "资金费率阈值不应超过10%，当前值过高"),
+    ('MIN_VOLUME', "最小成交量", 100000, "最小成交量不应低于10万USDT，可能过于严格", None, None),
+    ('MAX_POOL_SIZE', "最大池大小", None, None, 100, "最大池大小不应超过100，可能影响性能"),
+    ('CACHE_DURATION', "缓存时间", 300, "缓存时间不应少于5分钟，可能过于频繁", 86400, "缓存时间不应超过24小时，数据可能过时"),
+    ('UPDATE_INTERVAL', "更新间隔", 60, "更新间隔不应少于1分钟，可能过于频繁", None, None),
+    ('CONTRACT_REFRESH_INTERVAL', "合约刷新间隔", 300, "合约刷新间隔不应少于5分钟，可能过于频繁", None, None),
+    ('FUNDING_RATE_CHECK_INTERVAL', "资金费率检查间隔", 30, "资金费率检查间隔不应少于30秒，可能过于频繁", None, None),
+)
+
+# validate_all_configs 检查的配置字段，取值不变时直接复用上一次的验证结果
+VALIDATED_FIELDS = tuple(rule[0] for rule in FUNDING_RATE_RULES) + (
+    'TELEGRAM_BOT_TOKEN', 'TELEGRAM_CHAT_ID', 'API_PORT', 'API_HOST',
+)
+
 class ConfigValidator:
-    """配置验证器"""
+    """配置验证器
+    
+    字段类型已由 pydantic Settings 在导入时校验一次（类型不符会直接抛出 ValidationError），
+    这里只检查取值范围是否合理
+    """
+    
+    @staticmethod
+    def _check_ranges(rules) -> List[str]:
+        """按规则表检查数值配置：不大于0直接报错，其余按上下限给出提示"""
+        errors = []
+        for field, label, low, low_msg, high, high_msg in rules:
+            value = getattr(settings, field)
+            if value <= 0:
+                errors.append(f"{label}必须大于0")
+            elif low is not None and value < low:
+                errors.append(low_msg)
+            elif high is not None and value > high:
+                errors.append(high_msg)
+        return errors
     
     @staticmethod
     def validate_funding_rate_config() -> Tuple[bool, List[str]]:
@@ -17,72 +56,7 @@ class ConfigValidator:
         Returns:
             (是否有效, 错误消息列表)
         """
-        errors = []
-        
-        # 验证资金费率阈值
-        threshold = settings.FUNDING_RATE_THRESHOLD
-        if not isinstance(threshold, (int, float)):
-            errors.append("资金费率阈值必须是数字类型")
-        elif threshold <= 0:
-            errors.append("资金费率阈值必须大于0")
-        elif threshold > 0.1:  # 10%
-            errors.append("资金费率阈值不应超过10%，当前值过高")
-        
-        # 验证最小成交量
-        min_volume = settings.MIN_VOLUME
-        if not isinstance(min_volume, (int, float)):
-            errors.append("最小成交量必须是数字类型")
-        elif min_volume <= 0:
-            errors.append("最小成交量必须大于0")
-        elif min_volume < 100000:  # 10万USDT
-            errors.append("最小成交量不应低于10万USDT，可能过于严格")
-        
-        # 验证最大池大小
-        max_pool_size = settings.MAX_POOL_SIZE
-        if not isinstance(max_pool_size, int):
-            errors.append("最大池大小必须是整数")
-        elif max_pool_size <= 0:
-            errors.append("最大池大小必须大于0")
-        elif max_pool_size > 100:
-            errors.append("最大池大小不应超过100，可能影响性能")
-        
-        # 验证缓存时间
-        cache_duration = settings.CACHE_DURATION
-        if not isinstance(cache_duration, int):
-            errors.append("缓存时间必须是整数")
-        elif cache_duration <= 0:
-            errors.append("缓存时间必须大于0")
-        elif cache_duration < 300:  # 5分钟
-            errors.append("缓存时间不应少于5分钟，可能过于频繁")
-        elif cache_duration > 86400:  # 24小时
-            errors.append("缓存时间不应超过24小时，数据可能过时")
-        
-        # 验证更新间隔
-        update_interval = settings.UPDATE_INTERVAL
-        if not isinstance(update_interval, int):
-            errors.append("更新间隔必须是整数")
-        elif update_interval <= 0:
-            errors.append("更新间隔必须大于0")
-        elif update_interval < 60:  # 1分钟
-            errors.append("更新间隔不应少于1分钟，可能过于频繁")
-        
-        # 验证合约刷新间隔
-        contract_refresh_interval = settings.CONTRACT_REFRESH_INTERVAL
-        if not isinstance(contract_refresh_interval, int):
-            errors.append("合约刷新间隔必须是整数")
-        elif contract_refresh_interval <= 0:
-            errors.append("合约刷新间隔必须大于0")
-        elif contract_refresh_interval < 300:  # 5分钟
-            errors.append("合约刷新间隔不应少于5分钟，可能过于频繁")
-        
-        # 验证资金费率检查间隔
-        funding_rate_check_interval = settings.FUNDING_RATE_CHECK_INTERVAL
-        if not isinstance(funding_rate_check_interval, int):
-            errors.append("资金费率检查间隔必须是整数")
-        elif funding_rate_check_interval <= 0:
-            errors.append("资金费率检查间隔必须大于0")
-        elif funding_rate_check_interval < 30:  # 30秒
-            errors.append("资金费率检查间隔不应少于30秒，可能过于频繁")
+        errors = ConfigValidator._check_ranges(FUNDING_RATE_RULES)
         
         return len(errors) == 0, errors
     
@@ -100,8 +74,6 @@ class ConfigValidator:
         bot_token = settings.TELEGRAM_BOT_TOKEN
         if not bot_token:
             errors.append("Telegram Bot Token未配置")
-        elif not isinstance(bot_token, str):
-            errors.append("Telegram Bot Token必须是字符串")
         elif len(bot_token) < 10:
             errors.append("Telegram Bot Token格式不正确")
         
@@ -109,9 +81,7 @@ class ConfigValidator:
         chat_id = settings.TELEGRAM_CHAT_ID
         if not chat_id:
             errors.append("Telegram Chat ID未配置")
-        elif not isinstance(chat_id, str):
-            errors.append("Telegram Chat ID必须是字符串")
-        elif not chat_id.replace('-', '').isdigit():
+        elif not CHAT_ID_PATTERN.fullmatch(chat_id):
             errors.append("Telegram Chat ID格式不正确")
         
         return len(errors) == 0, errors
@@ -139,16 +109,12 @@ class ConfigValidator:
         
         # 验证API端口
         port = settings.API_PORT
-        if not isinstance(port, int):
-            errors.append("API端口必须是整数")
-        elif port <= 0 or port > 65535:
+        if port <= 0 or port > 65535:
             errors.append("API端口必须在1-65535范围内")
         
         # 验证API主机
         host = settings.API_HOST
-        if not isinstance(host, str):
-            errors.append("API主机必须是字符串")
-        elif host not in ['0.0.0.0', 'localhost', '127.0.0.1']:
+        if host not in ['0.0.0.0', 'localhost', '127.0.0.1']:
             errors.append("API主机配置可能不安全")
         
         return len(errors) == 0, errors
@@ -156,11 +122,17 @@ class ConfigValidator:
     @staticmethod
     def validate_all_configs() -> Tuple[bool, Dict[str, List[str]]]:
         """
-        验证所有配置
+        验证所有配置（结果按配置取值缓存）
         
         Returns:
             (是否全部有效, 各配置类别的错误消息)
         """
+        return ConfigValidator._validate_all(tuple(getattr(settings, name) for name in VALIDATED_FIELDS))
+    
+    @staticmethod
+    @lru_cache(maxsize=1)
+    def _validate_all(settings_fingerprint: tuple) -> Tuple[bool, Dict[str, List[str]]]:
+        """按配置取值指纹缓存的完整验证，settings_fingerprint 仅作为缓存键"""
         results = {}
         
         # 验证各类配置
@@ -13,23 +13,87 @@
   * Outlook：账户设置 -> 安全性 -> 应用密码
 """
 
-import smtplib
-import ssl
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from email.mime.base import MIMEBase
-from email import encoders
+import atexit
+import html
+import queue
+import threading
+from string import Template
 from datetime import datetime
-from typing import List, Optional, Dict, Any
-import traceback
+from typing import List, Optional, Dict, Any, TYPE_CHECKING
 import os
 
+# smtplib/ssl/email.mime 等模块只在真正发送邮件时才导入，不发邮件的进程无需承担导入开销
+if TYPE_CHECKING:
+    from email.mime.multipart import MIMEMultipart
+
 from config.settings import settings
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# SMTP连接共用的SSL上下文，首次建立连接时创建
+_SSL_CONTEXT = None
+
+# SMTP套接字超时（秒）：共享连接长期空闲后可能半开，没有超时的话noop/发送会一直阻塞并占住 _server_lock
+SMTP_TIMEOUT = 30
+
+
+def _get_ssl_context():
+    """获取共享的SSL上下文，避免每次连接都重新加载系统证书"""
+    global _SSL_CONTEXT
+    if _SSL_CONTEXT is None:
+        import ssl
+        _SSL_CONTEXT = ssl.create_default_context()
+    return _SSL_CONTEXT
+
+
+# 通知类型对应的主题图标和标题颜色
+NOTIFICATION_ICONS = {
+    "info": "ℹ️",
+    "warning": "⚠️",
+    "error": "❌",
+    "success": "✅"
+}
+NOTIFICATION_COLORS = {
+    "info": "#1976d2",
+    "warning": "#f57c00",
+    "error": "#d32f2f",
+    "success": "#388e3c"
+}
+
+# 通知邮件的HTML模板，只在模块加载时解析一次
+NOTIFICATION_HTML_TEMPLATE = Template("""
+<html>
+<head>
+    <meta charset="utf-8">
+    <style>
+        body { font-family: Arial, sans-serif; margin: 20px; }
+        .content { background-color: #f9f9f9; padding: 20px; border-radius: 5px; }
+        .footer { color: #666; font-size: 12px; margin-top: 20px; padding-top: 10px; border-top: 1px solid #eee; }
+        .$ntype { color: $color; }
+    </style>
+</head>
+<body>
+    <div class="content">
+        <h2 class="$ntype">$icon $title</h2>
+        <p>$html_content</p>
+    </div>
+    <div class="footer">
+        <p>发送时间: $timestamp</p>
+        <p>系统: 量化交易资金费率监控系统</p>
+    </div>
+</body>
+</html>
+        """)
 
 
 class EmailSender:
     """邮件发送器"""
     
+    # 所有实例共享一个已登录的SMTP连接，连续发送时不必每封邮件都重新握手和登录
+    _server = None
+    _server_lock = threading.Lock()
+    
     def __init__(self):
         """初始化邮件发送器"""
         self.smtp_server = settings.SMTP_SERVER
@@ -41,30 +105,30 @@ class EmailSender:
         self.use_tls = settings.SMTP_USE_TLS
         self.enabled = settings.EMAIL_ENABLED
         
-        # 验证配置
-        self._validate_config()
+        # 默认收件人的邮件头和投递地址列表，未指定收件人时直接复用
+        self._default_to_header = self.recipient
+        self._default_to_addrs = [self.recipient]
+        
+        # 验证配置（只在初始化时执行一次）
+        self._config_ok = self._validate_config_once()
     
-    def _validate_config(self):
+    def _validate_config_once(self):
         """验证邮件配置"""
-        print(f"🔍 验证邮件配置...")
-        print(f"   邮件启用状态: {self.enabled}")
-        print(f"   SMTP服务器: {self.smtp_server}")
-        print(f"   SMTP端口: {self.smtp_port}")
-        print(f"   用户名: {self.username}")
-        print(f"   授权码: {'已设置' if self.auth_code else '未设置'}")
-        print(f"   收件人: {self.recipient}")
-        print(f"   使用SSL: {self.use_ssl}")
-        print(f"   使用TLS: {self.use_tls}")
+        logger.debug(
+            "🔍 邮件配置: 启用=%s, SMTP=%s:%s, 用户名=%s, 授权码=%s, 收件人=%s, SSL=%s, TLS=%s",
+            self.enabled, self.smtp_server, self.smtp_port, self.username,
+            '已设置' if self.auth_code else '未设置', self.recipient, self.use_ssl, self.use_tls
+        )
         
         if not self.enabled:
-            print("⚠️ 邮件通知已禁用")
+            logger.warning("⚠️ 邮件通知已禁用")
             return False
             
         if not all([self.smtp_server, self.username, self.auth_code, self.recipient]):
-            print("⚠️ 邮件配置不完整，请检查SMTP_SERVER, SMTP_USERNAME, SMTP_AUTH_CODE, SMTP_RECIPIENT")
+            logger.warning("⚠️ 邮件配置不完整，请检查SMTP_SERVER, SMTP_USERNAME, SMTP_AUTH_CODE, SMTP_RECIPIENT")
             return False
             
-        print(f"✅ 邮件配置验证通过: {self.smtp_server}:{self.smtp_port}")
+        logger.debug("✅ 邮件配置验证通过: %s:%s", self.smtp_server, self.smtp_port)
         return True
     
     def send_email(self, subject: str, body: str, recipients: Optional[List[str]] = None, 
@@ -83,17 +147,20 @@ class EmailSender:
             bool: 发送是否成功
         """
         if not self.enabled:
-            print("⚠️ 邮件通知已禁用，跳过发送")
+            logger.info("⚠️ 邮件通知已禁用，跳过发送")
             return False
             
-        if not self._validate_config():
+        if not self._config_ok:
             return False
             
         try:
+            from email.mime.text import MIMEText
+            from email.mime.multipart import MIMEMultipart
+            
             # 创建邮件对象
             msg = MIMEMultipart('alternative')
             msg['From'] = self.username
-            msg['To'] = ', '.join(recipients) if recipients else self.recipient
+            msg['To'] = ', '.join(recipients) if recipients else self._default_to_header
             msg['Subject'] = subject
             
             # 添加纯文本正文
@@ -111,68 +178,128 @@ class EmailSender:
                     if os.path.exists(file_path):
                         self._add_attachment(msg, file_path)
                     else:
-                        print(f"⚠️ 附件文件不存在: {file_path}")
+                        logger.warning("⚠️ 附件文件不存在: %s", file_path)
             
             # 发送邮件
             return self._send_message(msg, recipients)
             
         except Exception as e:
-            print(f"❌ 发送邮件失败: {e}")
-            traceback.print_exc()
+            logger.exception("❌ 发送邮件失败: %s", e)
             return False
     
-    def _add_attachment(self, msg: MIMEMultipart, file_path: str):
+    def _add_attachment(self, msg: "MIMEMultipart", file_path: str):
         """添加附件到邮件"""
         try:
-            with open(file_path, "rb") as attachment:
-                part = MIMEBase('application', 'octet-stream')
-                part.set_payload(attachment.read())
+            import base64
+            import mmap
+            from email.mime.base import MIMEBase
             
-            encoders.encode_base64(part)
+            part = MIMEBase('application', 'octet-stream')
+            with open(file_path, "rb") as attachment:
+                if os.fstat(attachment.fileno()).st_size:
+                    # 通过mmap直接对文件内容做base64编码，不再先把原始字节整体读入内存
+                    with mmap.mmap(attachment.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                        payload = base64.encodebytes(mapped).decode('ascii')
+                else:
+                    payload = ''
+            part.set_payload(payload)
+            part['Content-Transfer-Encoding'] = 'base64'
             filename = os.path.basename(file_path)
             part.add_header(
                 'Content-Disposition',
                 f'attachment; filename= {filename}'
             )
             msg.attach(part)
-            print(f"✅ 已添加附件: {filename}")
+            logger.info("✅ 已添加附件: %s", filename)
             
         except Exception as e:
-            print(f"⚠️ 添加附件失败 {file_path}: {e}")
+            logger.warning("⚠️ 添加附件失败 %s: %s", file_path, e)
+    
+    def _connect(self):
+        """建立SMTP连接并登录"""
+        import smtplib
+        
+        # 创建SMTP连接
+        if self.use_ssl:
+            server = smtplib.SMTP_SSL(self.smtp_server, self.smtp_port, timeout=SMTP_TIMEOUT,
+                                      context=_get_ssl_context())
+        else:
+            server = smtplib.SMTP(self.smtp_server, self.smtp_port, timeout=SMTP_TIMEOUT)
+        
+        # 启用TLS（如果需要）
+        if self.use_tls and not self.use_ssl:
+            server.starttls(context=_get_ssl_context())
+        
+        # 登录（使用邮箱授权码）
+        server.login(self.username, self.auth_code)
+        return server
+    
+    def _get_server(self):
+        """获取可用的共享SMTP连接，连接不存在或已被服务器断开时重新建立（调用方需持有 _server_lock）"""
+        import smtplib
+        
+        server = EmailSender._server
+        if server is not None:
+            try:
+                if server.noop()[0] == 250:
+                    return server
+            except (smtplib.SMTPException, OSError):
+                pass
+            EmailSender._close_server()
+        EmailSender._server = self._connect()
+        return EmailSender._server
+    
+    @staticmethod
+    def _close_server():
+        """关闭共享SMTP连接"""
+        server = EmailSender._server
+        EmailSender._server = None
+        if server is not None:
+            try:
+                server.quit()
+            except Exception:
+                pass
     
-    def _send_message(self, msg: MIMEMultipart, recipients: Optional[List[str]] = None) -> bool:
+    @staticmethod
+    def _drop_server():
+        """丢弃已超时的共享SMTP连接，直接关闭套接字而不发送QUIT（半开连接上QUIT同样会等到超时）"""
+        server = EmailSender._server
+        EmailSender._server = None
+        if server is not None:
+            try:
+                server.close()
+            except Exception:
+                pass
+    
+    def _send_message(self, msg: "MIMEMultipart", recipients: Optional[List[str]] = None) -> bool:
         """发送邮件消息"""
         try:
-            # 确定收件人
-            to_emails = recipients if recipients else [self.recipient]
-            
-            # 创建SMTP连接
-            if self.use_ssl:
-                server = smtplib.SMTP_SSL(self.smtp_server, self.smtp_port)
-            else:
-                server = smtplib.SMTP(self.smtp_server, self.smtp_port)
-            
-            # 启用TLS（如果需要）
-            if self.use_tls and not self.use_ssl:
-                server.starttls()
-            
-            # 登录（使用邮箱授权码）
-            server.login(self.username, self.auth_code)
+            import smtplib
+            import socket
             
-            # 发送邮件
-            server.send_message(msg, from_addr=self.username, to_addrs=to_emails)
+            # 确定收件人
+            to_emails = recipients if recipients else self._default_to_addrs
             
-            # 关闭连接
-            server.quit()
+            with EmailSender._server_lock:
+                try:
+                    self._get_server().send_message(msg, from_addr=self.username, to_addrs=to_emails)
+                except smtplib.SMTPServerDisconnected:
+                    # 连接在检查后被服务器关闭，重连后重试一次
+                    EmailSender._close_server()
+                    self._get_server().send_message(msg, from_addr=self.username, to_addrs=to_emails)
+                except socket.timeout:
+                    EmailSender._drop_server()
+                    raise
             
-            print(f"✅ 邮件发送成功: {msg['Subject']} -> {', '.join(to_emails)}")
+            logger.info("✅ 邮件发送成功: %s -> %s", msg['Subject'], to_emails)
             return True
             
         except Exception as e:
-            print(f"❌ SMTP发送失败: {e}")
+            logger.error("❌ SMTP发送失败: %s", e)
             return False
     
-    def send_notification(self, title: str, content: str, notification_type: str = "info") -> bool:
+    def send_notification(self, title: str, content: str, notification_type: str = "info",
+                          trusted: bool = False) -> bool:
         """
         发送系统通知邮件
         
@@ -180,19 +307,13 @@ class EmailSender:
             title: 通知标题
             content: 通知内容
             notification_type: 通知类型 (info, warning, error, success)
+            trusted: 标题和内容是否为固定文本，为True时HTML正文不做转义
             
         Returns:
             bool: 发送是否成功
         """
         # 根据类型设置主题前缀
-        type_icons = {
-            "info": "ℹ️",
-            "warning": "⚠️", 
-            "error": "❌",
-            "success": "✅"
-        }
-        
-        icon = type_icons.get(notification_type, "ℹ️")
+        icon = NOTIFICATION_ICONS.get(notification_type, "ℹ️")
         subject = f"{icon} {title}"
         
         # 构建邮件正文
@@ -207,29 +328,14 @@ class EmailSender:
         """.strip()
         
         # 构建HTML正文
-        html_body = f"""
-<html>
-<head>
-    <meta charset="utf-8">
-    <style>
-        body {{ font-family: Arial, sans-serif; margin: 20px; }}
-        .content {{ background-color: #f9f9f9; padding: 20px; border-radius: 5px; }}
-        .footer {{ color: #666; font-size: 12px; margin-top: 20px; padding-top: 10px; border-top: 1px solid #eee; }}
-        .{notification_type} {{ color: {'#d32f2f' if notification_type == 'error' else '#f57c00' if notification_type == 'warning' else '#388e3c' if notification_type == 'success' else '#1976d2'}; }}
-    </style>
-</head>
-<body>
-    <div class="content">
-        <h2 class="{notification_type}">{icon} {title}</h2>
-        <p>{content.replace(chr(10), '<br>')}</p>
-    </div>
-    <div class="footer">
-        <p>发送时间: {timestamp}</p>
-        <p>系统: 量化交易资金费率监控系统</p>
-    </div>
-</body>
-</html>
-        """
+        html_body = NOTIFICATION_HTML_TEMPLATE.substitute(
+            ntype=notification_type,
+            color=NOTIFICATION_COLORS.get(notification_type, "#1976d2"),
+            icon=icon,
+            title=title if trusted else html.escape(title),
+            html_content=(content if trusted else html.escape(content)).replace('\n', '<br>'),
+            timestamp=timestamp
+        )
         
         return self.send_email(subject, body, html_body=html_body)
     
@@ -334,7 +440,94 @@ class EmailSender:
 系统将能够正常发送通知邮件。
         """.strip()
         
-        return self.send_notification(title, content, "info")
+        return self.send_notification(title, content, "info", trusted=True)
+
+
+# 进程退出时关闭共享的SMTP连接
+atexit.register(EmailSender._close_server)
+
+
+# 后台邮件队列：调用方只负责入队，由守护线程批量取出后通过共享连接依次发送
+_EMAIL_QUEUE = queue.Queue()
+_EMAIL_BATCH_SIZE = 16
+# 进程退出时等待队列发完的最长时间（秒）
+_EMAIL_SHUTDOWN_TIMEOUT = 60
+# 放入队列表示发完已入队的邮件后退出
+_EMAIL_STOP = object()
+_email_worker = None
+_email_worker_lock = threading.Lock()
+
+
+def _email_worker_loop():
+    """后台发送线程：阻塞等待第一封邮件，再短暂收集同批邮件一起发送，收到 _EMAIL_STOP 时发完当前批次后退出"""
+    stopping = False
+    while not stopping:
+        item = _EMAIL_QUEUE.get()
+        if item is _EMAIL_STOP:
+            break
+        batch = [item]
+        while len(batch) < _EMAIL_BATCH_SIZE:
+            try:
+                item = _EMAIL_QUEUE.get(timeout=0.2)
+            except queue.Empty:
+                break
+            if item is _EMAIL_STOP:
+                stopping = True
+                break
+            batch.append(item)
+        
+        try:
+            email_sender = EmailSender()
+        except Exception as e:
+            logger.error("❌ 后台邮件发送器初始化失败，丢弃 %d 封邮件: %s", len(batch), e)
+            continue
+        
+        for method_name, args, kwargs in batch:
+            try:
+                if not getattr(email_sender, method_name)(*args, **kwargs):
+                    logger.error("❌ 后台发送邮件失败 (%s): %s %s", method_name, args, kwargs)
+            except Exception as e:
+                logger.error("❌ 后台发送邮件失败 (%s): %s", method_name, e)
+
+
+def _shutdown_email_worker():
+    """进程退出时让后台线程发完队列中的邮件，之后再关闭共享SMTP连接"""
+    worker = _email_worker
+    if worker is None or not worker.is_alive():
+        return
+    _EMAIL_QUEUE.put(_EMAIL_STOP)
+    worker.join(_EMAIL_SHUTDOWN_TIMEOUT)
+    if worker.is_alive():
+        logger.warning("⚠️ 邮件队列在 %d 秒内未发送完，剩余邮件将被丢弃", _EMAIL_SHUTDOWN_TIMEOUT)
+
+
+# atexit按注册的逆序执行，这里晚于 _close_server 注册，保证先发完队列再关闭连接
+atexit.register(_shutdown_email_worker)
+
+
+def queue_email(method_name: str, *args, **kwargs) -> bool:
+    """
+    将邮件放入后台队列异步发送，不阻塞调用方
+    
+    Args:
+        method_name: EmailSender 的发送方法名，如 send_pool_change_notification
+        *args, **kwargs: 传给该方法的参数
+        
+    Returns:
+        bool: 是否已加入发送队列（不代表已发送成功，发送失败由后台线程记录错误日志）
+    """
+    global _email_worker
+    if not callable(getattr(EmailSender, method_name, None)):
+        logger.error("❌ 未知的邮件发送方法: %s", method_name)
+        return False
+    
+    with _email_worker_lock:
+        if _email_worker is None or not _email_worker.is_alive():
+            _email_worker = threading.Thread(target=_email_worker_loop, name="email-sender", daemon=True)
+            _email_worker.start()
+    
+    _EMAIL_QUEUE.put((method_name, args, kwargs))
+    return True
 
 
 # 便捷函数
@@ -344,7 +537,7 @@ def send_email_notification(title: str, content: str, notification_type: str = "
         email_sender = EmailSender()
         return email_sender.send_notification(title, content, notification_type)
     except Exception as e:
-        print(f"❌ 发送邮件通知失败: {e}")
+        logger.error("❌ 发送邮件通知失败: %s", e)
         return False
 
 
@@ -355,25 +548,23 @@ def send_funding_rate_warning_email(symbol: str, funding_rate: float, mark_price
         email_sender = EmailSender()
         return email_sender.send_funding_rate_warning(symbol, funding_rate, mark_price, volume_24h, next_funding_time)
     except Exception as e:
-        print(f"❌ 发送资金费率警告邮件失败: {e}")
+        logger.error("❌ 发送资金费率警告邮件失败: %s", e)
         return False
 
 
 def send_pool_change_email(added_contracts: List[str], removed_contracts: List[str]) -> bool:
     """便捷函数：发送监控池变化邮件"""
     try:
-        print(f"📧 开始发送监控池变化邮件 - 入池: {added_contracts}, 出池: {removed_contracts}")
+        logger.info("📧 开始发送监控池变化邮件 - 入池: %s, 出池: %s", added_contracts, removed_contracts)
         email_sender = EmailSender()
         success = email_sender.send_pool_change_notification(added_contracts, removed_contracts)
         if success:
-            print(f"✅ 监控池变化邮件发送成功")
+            logger.info("✅ 监控池变化邮件发送成功")
         else:
-            print(f"❌ 监控池变化邮件发送失败")
+            logger.error("❌ 监控池变化邮件发送失败")
         return success
     except Exception as e:
-        print(f"❌ 发送监控池变化邮件异常: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("❌ 发送监控池变化邮件异常: %s", e)
         return False
 
 
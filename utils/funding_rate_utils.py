@@ -5,9 +5,25 @@
 
 import json
 import os
+import time
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple, Union
 from utils.notifier import send_telegram_message
+from utils.logger import get_logger
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = get_logger(__name__)
+
+# 费率方向与数据来源的显示文本
+FUNDING_DIRECTIONS = {True: "多头", False: "空头"}
+DATA_SOURCE_LABELS = {"real_time": "实时"}
+
+# 同一聊天连续发送通知的间隔（秒），Telegram对单个聊天大约限制每秒1条，超出会返回429
+TELEGRAM_SEND_INTERVAL = 1.0
 
 class FundingRateUtils:
     """资金费率工具类"""
@@ -28,44 +44,50 @@ class FundingRateUtils:
         warning_count = 0
         warning_messages = []
         
+        # 先筛出超过阈值的合约并构建通知消息
+        pending = []
         for symbol, info in contracts.items():
             try:
                 funding_rate = float(info.get('funding_rate', 0))
                 if abs(funding_rate) >= threshold:
-                    # 构建通知消息
-                    message = FundingRateUtils._build_warning_message(symbol, info, source)
-                    
-                    # 发送通知
-                    try:
-                        send_telegram_message(message)
-                        warning_count += 1
-                        warning_messages.append(f"📢 {source}: 发送资金费率警告通知: {symbol}")
-                    except Exception as e:
-                        warning_messages.append(f"⚠️ {source}: 发送Telegram通知失败: {e}")
-                        
+                    pending.append((symbol, FundingRateUtils._build_warning_message(symbol, info, source)))
             except (ValueError, TypeError) as e:
                 warning_messages.append(f"⚠️ {source}: 处理合约 {symbol} 资金费率时出错: {e}")
                 continue
         
+        if not pending:
+            return warning_count, warning_messages
+        
+        # 所有通知发往同一个聊天，按顺序逐条发送并限速，避免触发Telegram的单聊天频率限制
+        for i, (symbol, message) in enumerate(pending):
+            if i:
+                time.sleep(TELEGRAM_SEND_INTERVAL)
+            try:
+                sent = send_telegram_message(message)
+            except Exception as e:
+                warning_messages.append(f"⚠️ {source}: 发送Telegram通知失败: {e}")
+                continue
+            if sent:
+                warning_count += 1
+                warning_messages.append(f"📢 {source}: 发送资金费率警告通知: {symbol}")
+            else:
+                warning_messages.append(f"⚠️ {source}: 发送Telegram通知失败: {symbol}")
+        
         return warning_count, warning_messages
     
     @staticmethod
     def _build_warning_message(symbol: str, info: Dict, source: str) -> str:
         """构建警告消息"""
         funding_rate = float(info.get('funding_rate', 0))
-        direction = "多头" if funding_rate > 0 else "空头"
-        mark_price = info.get('mark_price', 0)
-        next_funding_time = info.get('next_funding_time', '未知')
-        data_source = info.get('data_source', 'unknown')
         
-        message = f"⚠️ 资金费率警告({source}): {symbol}\n" \
-                 f"当前费率: {funding_rate:.4%} ({direction})\n" \
-                 f"标记价格: ${mark_price:.4f}\n" \
-                 f"下次结算时间: {next_funding_time}\n" \
-                 f"数据来源: {'实时' if data_source == 'real_time' else '缓存'}\n" \
-                 f"24h成交量: {info.get('volume_24h', 0):,.0f}"
-        
-        return message
+        return "\n".join((
+            f"⚠️ 资金费率警告({source}): {symbol}",
+            f"当前费率: {funding_rate:.4%} ({FUNDING_DIRECTIONS[funding_rate > 0]})",
+            f"标记价格: ${info.get('mark_price', 0):.4f}",
+            f"下次结算时间: {info.get('next_funding_time', '未知')}",
+            f"数据来源: {DATA_SOURCE_LABELS.get(info.get('data_source'), '缓存')}",
+            f"24h成交量: {info.get('volume_24h', 0):,.0f}",
+        ))
     
     @staticmethod
     def format_funding_rate_display(funding_rate: float) -> Tuple[str, str]:
@@ -104,15 +126,21 @@ class FundingRateUtils:
             是否保存成功
         """
         try:
+            # 记录写入时间的epoch秒数，读取方可直接做浮点比较；写入副本，不改动调用方的字典
+            cache_data = {**cache_data, 'cache_time_epoch': time.time()}
             os.makedirs(os.path.dirname(cache_file), exist_ok=True)
-            with open(cache_file, 'w', encoding='utf-8') as f:
-                json.dump(cache_data, f, ensure_ascii=False, indent=2)
+            if orjson is not None:
+                with open(cache_file, 'wb') as f:
+                    f.write(orjson.dumps(cache_data, option=orjson.OPT_INDENT_2))
+            else:
+                with open(cache_file, 'w', encoding='utf-8') as f:
+                    json.dump(cache_data, f, ensure_ascii=False, indent=2)
             
-            print(f"💾 {description}已保存到缓存: {cache_file}")
+            logger.info("💾 %s已保存到缓存: %s", description, cache_file)
             return True
             
         except Exception as e:
-            print(f"⚠️ 保存{description}失败: {e}")
+            logger.warning("⚠️ 保存%s失败: %s", description, e)
             return False
     
     @staticmethod
@@ -128,26 +156,34 @@ class FundingRateUtils:
             缓存数据或None
         """
         try:
-            if os.path.exists(cache_file):
-                with open(cache_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                print(f"📋 从缓存加载了{description}")
-                return data
-            else:
-                print(f"📋 {description}缓存文件不存在: {cache_file}")
-                return None
-                
+            # 直接打开文件，不存在时由FileNotFoundError处理，省去一次exists检查
+            with open(cache_file, 'rb') as f:
+                raw = f.read()
+            data = orjson.loads(raw) if orjson is not None else json.loads(raw.decode('utf-8'))
+            logger.info("📋 从缓存加载了%s", description)
+            return data
+            
+        except FileNotFoundError:
+            logger.info("📋 %s缓存文件不存在: %s", description, cache_file)
+            return None
         except Exception as e:
-            print(f"⚠️ 读取{description}缓存失败: {e}")
+            logger.warning("⚠️ 读取%s缓存失败: %s", description, e)
             return None
     
     @staticmethod
-    def is_cache_valid(cache_time: str, cache_duration: int) -> bool:
+    def _cache_age(cache_time: Union[str, float]) -> float:
+        """计算缓存年龄（秒），cache_time 为epoch秒数时直接相减，旧的ISO字符串才需解析"""
+        if isinstance(cache_time, (int, float)):
+            return time.time() - cache_time
+        return (datetime.now() - datetime.fromisoformat(cache_time)).total_seconds()
+    
+    @staticmethod
+    def is_cache_valid(cache_time: Union[str, float], cache_duration: int) -> bool:
         """
         检查缓存是否有效
         
         Args:
-            cache_time: 缓存时间字符串
+            cache_time: 缓存时间（epoch秒数，或旧格式的ISO时间字符串）
             cache_duration: 缓存有效期（秒）
             
         Returns:
@@ -157,20 +193,18 @@ class FundingRateUtils:
             if not cache_time:
                 return False
             
-            cache_dt = datetime.fromisoformat(cache_time)
-            cache_age = (datetime.now() - cache_dt).total_seconds()
-            return cache_age < cache_duration
+            return FundingRateUtils._cache_age(cache_time) < cache_duration
             
         except Exception:
             return False
     
     @staticmethod
-    def get_cache_age_display(cache_time: str) -> str:
+    def get_cache_age_display(cache_time: Union[str, float]) -> str:
         """
         获取缓存年龄的显示文本
         
         Args:
-            cache_time: 缓存时间字符串
+            cache_time: 缓存时间（epoch秒数，或旧格式的ISO时间字符串）
             
         Returns:
             年龄显示文本
@@ -179,8 +213,7 @@ class FundingRateUtils:
             if not cache_time:
                 return "未知"
             
-            cache_dt = datetime.fromisoformat(cache_time)
-            cache_age = (datetime.now() - cache_dt).total_seconds()
+            cache_age = FundingRateUtils._cache_age(cache_time)
             
             if cache_age < 60:
                 return f"{cache_age:.0f}秒前"
@@ -3,10 +3,17 @@
 统一日志工具
 """
 
+import atexit
 import logging
+import logging.handlers
+import os
+import queue
+import re
 import sys
-from datetime import datetime
-from typing import Optional
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional, Tuple
 
 class ColoredFormatter(logging.Formatter):
     """彩色日志格式化器"""
@@ -20,50 +27,90 @@ class ColoredFormatter(logging.Formatter):
         'RESET': '\033[0m'        # 重置
     }
     
+    # INFO消息识别的emoji前缀
+    EMOJIS = ('✅', '❌', '⚠️', '📢', '💾', '📋', '🔄', '📊', '📈', '📡', '🧪', '🚀', '🛑')
+    DEFAULT_EMOJI = 'ℹ️'
+    _EMOJI_RE = re.compile('|'.join(map(re.escape, EMOJIS)))
+    
+    # 按秒缓存的时间戳：(秒, 格式化字符串)，整体读写一个元组，多线程格式化时不会拿到错配的一对
+    _ts_cache = (-1, "")
+    
     def format(self, record):
-        # 添加时间戳
-        record.timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        # 添加时间戳（精度为秒，同一秒内复用已格式化的字符串）
+        second = int(record.created)
+        cached_second, timestamp = ColoredFormatter._ts_cache
+        if second != cached_second:
+            timestamp = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(second))
+            ColoredFormatter._ts_cache = (second, timestamp)
+        record.timestamp = timestamp
         
-        # 添加颜色
-        color = self.COLORS.get(record.levelname, self.COLORS['RESET'])
-        reset = self.COLORS['RESET']
+        # 只有INFO级别需要加emoji前缀，其他级别直接格式化
+        if record.levelname != 'INFO':
+            return super().format(record)
         
-        # 格式化消息
-        if record.levelname == 'INFO':
-            # 特殊处理INFO级别的emoji
-            if '✅' in record.getMessage():
-                record.msg = f"{color}✅{reset} {record.msg}"
-            elif '❌' in record.getMessage():
-                record.msg = f"{color}❌{reset} {record.msg}"
-            elif '⚠️' in record.getMessage():
-                record.msg = f"{color}⚠️{reset} {record.msg}"
-            elif '📢' in record.getMessage():
-                record.msg = f"{color}📢{reset} {record.msg}"
-            elif '💾' in record.getMessage():
-                record.msg = f"{color}💾{reset} {record.msg}"
-            elif '📋' in record.getMessage():
-                record.msg = f"{color}📋{reset} {record.msg}"
-            elif '🔄' in record.getMessage():
-                record.msg = f"{color}🔄{reset} {record.msg}"
-            elif '📊' in record.getMessage():
-                record.msg = f"{color}📊{reset} {record.msg}"
-            elif '📈' in record.getMessage():
-                record.msg = f"{color}📈{reset} {record.msg}"
-            elif '📡' in record.getMessage():
-                record.msg = f"{color}📡{reset} {record.msg}"
-            elif '🧪' in record.getMessage():
-                record.msg = f"{color}🧪{reset} {record.msg}"
-            elif '🚀' in record.getMessage():
-                record.msg = f"{color}🚀{reset} {record.msg}"
-            elif '🛑' in record.getMessage():
-                record.msg = f"{color}🛑{reset} {record.msg}"
-            else:
-                record.msg = f"{color}ℹ️{reset} {record.msg}"
+        # 特殊处理INFO级别的emoji：一次匹配取出消息中的emoji，没有则用默认图标
+        color = self.COLORS['INFO']
+        reset = self.COLORS['RESET']
+        message = record.getMessage()
+        match = self._EMOJI_RE.search(message)
+        emoji = match.group() if match else self.DEFAULT_EMOJI
         
-        return super().format(record)
+        # 用已插值的消息替换msg并清空args，父类格式化时不再重复插值；
+        # 仅在本次格式化期间改写，避免前缀泄漏到其他处理器
+        original_msg, original_args = record.msg, record.args
+        record.msg = f"{color}{emoji}{reset} {message}"
+        record.args = None
+        try:
+            return super().format(record)
+        finally:
+            record.msg, record.args = original_msg, original_args
+
+class BufferedRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """按大小轮转的文件处理器，写入走大缓冲区，WARNING及以上立即刷盘，其余由后台线程每flush_interval秒刷盘一次"""
+    
+    def __init__(self, filename: str, maxBytes: int = 10 * 1024 * 1024, backupCount: int = 5,
+                 encoding: str = 'utf-8', buffer_size: int = 64 * 1024, flush_interval: float = 1.0):
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self._size = 0
+        self._flush_stop = threading.Event()
+        super().__init__(filename, maxBytes=maxBytes, backupCount=backupCount,
+                         encoding=encoding, delay=True)
+        threading.Thread(target=self._flush_periodically, name="log-file-flush", daemon=True).start()
+    
+    def _open(self):
+        # 自行记录文件大小，避免父类shouldRollover每条记录seek到文件末尾而冲掉缓冲区
+        self._size = os.path.getsize(self.baseFilename) if os.path.exists(self.baseFilename) else 0
+        return open(self.baseFilename, self.mode, buffering=self.buffer_size,
+                    encoding=self.encoding, errors=self.errors)
+    
+    def emit(self, record):
+        try:
+            msg = self.format(record) + self.terminator
+            size = len(msg.encode(self.encoding or 'utf-8', errors='replace'))
+            if self.stream is None:
+                self.stream = self._open()
+            if self.maxBytes > 0 and self._size > 0 and self._size + size > self.maxBytes:
+                self.doRollover()
+                if self.stream is None:
+                    self.stream = self._open()
+            self.stream.write(msg)
+            self._size += size
+            if record.levelno >= logging.WARNING:
+                self.stream.flush()
+        except Exception:
+            self.handleError(record)
+    
+    def _flush_periodically(self):
+        while not self._flush_stop.wait(self.flush_interval):
+            self.flush()
+    
+    def close(self):
+        self._flush_stop.set()
+        super().close()
 
 def setup_logger(name: str = "quant_trading", level: str = "INFO", 
-                log_file: Optional[str] = None) -> logging.Logger:
+                log_file: Optional[str] = None, buffer_capacity: int = 0) -> logging.Logger:
     """
     设置统一的日志器
     
@@ -71,6 +118,7 @@ def setup_logger(name: str = "quant_trading", level: str = "INFO",
         name: 日志器名称
         level: 日志级别
         log_file: 日志文件路径（可选）
+        buffer_capacity: 控制台输出缓冲条数，大于0时攒够条数或遇到ERROR才批量输出（可选）
         
     Returns:
         配置好的日志器
@@ -82,25 +130,42 @@ def setup_logger(name: str = "quant_trading", level: str = "INFO",
     if logger.handlers:
         return logger
     
-    # 创建格式化器
+    # 创建格式化器：控制台带颜色和emoji，文件输出纯文本
     formatter = ColoredFormatter(
         '%(timestamp)s | %(levelname)-8s | %(name)s:%(funcName)s:%(lineno)d - %(message)s'
     )
+    file_formatter = logging.Formatter(
+        '%(asctime)s | %(levelname)-8s | %(name)s:%(funcName)s:%(lineno)d - %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
     
     # 控制台处理器
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
+    if buffer_capacity > 0:
+        logger.addHandler(logging.handlers.MemoryHandler(
+            buffer_capacity, flushLevel=logging.ERROR, target=console_handler
+        ))
+    else:
+        logger.addHandler(console_handler)
     
     # 文件处理器（如果指定了日志文件）
     if log_file:
         try:
-            import os
-            os.makedirs(os.path.dirname(log_file), exist_ok=True)
+            Path(log_file).parent.mkdir(parents=True, exist_ok=True)
             
-            file_handler = logging.FileHandler(log_file, encoding='utf-8')
-            file_handler.setFormatter(formatter)
-            logger.addHandler(file_handler)
+            file_handler = BufferedRotatingFileHandler(log_file)
+            file_handler.setFormatter(file_formatter)
+            # 文件写入交给后台线程，调用线程只负责入队
+            log_queue = queue.Queue(-1)
+            listener = logging.handlers.QueueListener(
+                log_queue, file_handler, respect_handler_level=True
+            )
+            listener.start()
+            # atexit按注册的逆序执行：先停止监听线程写完队列，再关闭文件刷出缓冲区
+            atexit.register(file_handler.close)
+            atexit.register(listener.stop)
+            logger.addHandler(logging.handlers.QueueHandler(log_queue))
             
         except Exception as e:
             logger.warning(f"无法创建文件日志处理器: {e}")
@@ -121,50 +186,55 @@ def get_logger(name: str = "quant_trading") -> logging.Logger:
 
 # 预定义的日志消息模板
 class LogMessages:
-    """日志消息模板"""
+    """日志消息模板
+
+    每个方法返回 ``(格式串, *参数)`` 元组，调用时解包传给 logger，
+    例如 ``logger.info(*LogMessages.api_call_start(endpoint))``，
+    级别被过滤时不会进行字符串插值。
+    """
     
     @staticmethod
-    def api_call_start(endpoint: str) -> str:
-        return f"开始调用API: {endpoint}"
+    def api_call_start(endpoint: str) -> Tuple[Any, ...]:
+        return ("开始调用API: %s", endpoint)
     
     @staticmethod
-    def api_call_success(endpoint: str, data_count: int = 0) -> str:
+    def api_call_success(endpoint: str, data_count: int = 0) -> Tuple[Any, ...]:
         if data_count > 0:
-            return f"API调用成功: {endpoint}，获取到 {data_count} 条数据"
-        return f"API调用成功: {endpoint}"
+            return ("API调用成功: %s，获取到 %d 条数据", endpoint, data_count)
+        return ("API调用成功: %s", endpoint)
     
     @staticmethod
-    def api_call_failed(endpoint: str, error: str) -> str:
-        return f"API调用失败: {endpoint}，错误: {error}"
+    def api_call_failed(endpoint: str, error: str) -> Tuple[Any, ...]:
+        return ("API调用失败: %s，错误: %s", endpoint, error)
     
     @staticmethod
-    def cache_save_success(file_path: str, description: str = "数据") -> str:
-        return f"{description}已保存到缓存: {file_path}"
+    def cache_save_success(file_path: str, description: str = "数据") -> Tuple[Any, ...]:
+        return ("%s已保存到缓存: %s", description, file_path)
     
     @staticmethod
-    def cache_load_success(file_path: str, description: str = "数据") -> str:
-        return f"从缓存加载了{description}: {file_path}"
+    def cache_load_success(file_path: str, description: str = "数据") -> Tuple[Any, ...]:
+        return ("从缓存加载了%s: %s", description, file_path)
     
     @staticmethod
-    def funding_rate_check_start(source: str) -> str:
-        return f"{source}: 开始检查资金费率"
+    def funding_rate_check_start(source: str) -> Tuple[Any, ...]:
+        return ("%s: 开始检查资金费率", source)
     
     @staticmethod
-    def funding_rate_warning_count(count: int, source: str) -> str:
-        return f"{source}: 发送了 {count} 个资金费率警告通知"
+    def funding_rate_warning_count(count: int, source: str) -> Tuple[Any, ...]:
+        return ("%s: 发送了 %d 个资金费率警告通知", source, count)
     
     @staticmethod
-    def funding_rate_all_normal(source: str) -> str:
-        return f"{source}: 所有合约资金费率都在正常范围内"
+    def funding_rate_all_normal(source: str) -> Tuple[Any, ...]:
+        return ("%s: 所有合约资金费率都在正常范围内", source)
     
     @staticmethod
-    def task_start(task_name: str) -> str:
-        return f"开始执行任务: {task_name}"
+    def task_start(task_name: str) -> Tuple[Any, ...]:
+        return ("开始执行任务: %s", task_name)
     
     @staticmethod
-    def task_complete(task_name: str) -> str:
-        return f"任务完成: {task_name}"
+    def task_complete(task_name: str) -> Tuple[Any, ...]:
+        return ("任务完成: %s", task_name)
     
     @staticmethod
-    def task_failed(task_name: str, error: str) -> str:
-        return f"任务失败: {task_name}，错误: {error}"
+    def task_failed(task_name: str, error: str) -> Tuple[Any, ...]:
+        return ("任务失败: %s，错误: %s", task_name, error)
@@ -1,12 +1,18 @@
 import os
+from functools import lru_cache
 import requests
-import urllib3
 from typing import Optional
 from loguru import logger
 from config.settings import settings
 
-# 禁用urllib3的SSL警告
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+# 默认Telegram配置在导入时解析一次（仅来自config.settings，不读取环境变量）
+_DEFAULT_CHAT_ID = settings.TELEGRAM_CHAT_ID
+_DEFAULT_BOT_TOKEN = settings.TELEGRAM_BOT_TOKEN
+
+
+@lru_cache(maxsize=2)
+def _send_message_url(bot_token: str) -> str:
+    return f"https://api.telegram.org/bot{bot_token}/sendMessage"
 
 def send_telegram_message(message: str, chat_id: Optional[str] = None, bot_token: Optional[str] = None) -> bool:
     """
@@ -22,15 +28,15 @@ def send_telegram_message(message: str, chat_id: Optional[str] = None, bot_token
     """
     try:
         # 仅从参数或config.settings读取，不再读取环境变量
-        chat_id = chat_id or settings.TELEGRAM_CHAT_ID
-        bot_token = bot_token or settings.TELEGRAM_BOT_TOKEN
+        chat_id = chat_id or _DEFAULT_CHAT_ID
+        bot_token = bot_token or _DEFAULT_BOT_TOKEN
         
         if not chat_id or not bot_token:
             logger.warning("Telegram配置缺失，跳过消息发送")
             return False
         
         # 构建API URL
-        url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
+        url = _send_message_url(bot_token)
         
         # 发送消息
         data = {
@@ -42,11 +48,11 @@ def send_telegram_message(message: str, chat_id: Optional[str] = None, bot_token
         response = requests.post(url, data=data, timeout=10)
         response.raise_for_status()
         
-        logger.info(f"Telegram消息发送成功: {message[:50]}...")
+        logger.info("Telegram消息发送成功: {}...", message[:50])
         return True
         
     except Exception as e:
-        logger.error(f"发送Telegram消息失败: {e}")
+        logger.error("发送Telegram消息失败: {}", e)
         return False
 
 def send_email_notification(subject: str, message: str, to_email: Optional[str] = None) -> bool:
@@ -72,14 +78,14 @@ def send_email_notification(subject: str, message: str, to_email: Optional[str]
         success = email_sender.send_email(subject, message, recipients=recipients)
         
         if success:
-            logger.info(f"邮件通知发送成功: {subject}")
+            logger.info("邮件通知发送成功: {}", subject)
         else:
-            logger.warning(f"邮件通知发送失败: {subject}")
+            logger.warning("邮件通知发送失败: {}", subject)
             
         return success
         
     except Exception as e:
-        logger.error(f"发送邮件通知失败: {e}")
+        logger.error("发送邮件通知失败: {}", e)
         return False
 
 def send_discord_notification(message: str, webhook_url: Optional[str] = None) -> bool:
@@ -94,5 +100,5 @@ def send_discord_notification(message: str, webhook_url: Optional[str] = None) -
         bool: 发送是否成功
     """
     # TODO: 实现Discord通知功能
-    logger.info(f"Discord通知功能待实现: {message[:50]}...")
+    logger.info("Discord通知功能待实现: {}...", message[:50])
     return False 
\ No newline at end of file
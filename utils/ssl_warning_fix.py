@@ -2,10 +2,7 @@
 """
 SSL警告修复工具
 用于禁用urllib3的SSL证书验证警告
-"""
-import urllib3
-
-# 禁用urllib3的SSL警告
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
-print("✅ SSL警告已禁用")
+实际的禁用逻辑已移到 utils/__init__.py，导入utils包即生效；
+保留本模块以兼容 ``from utils.ssl_warning_fix import *`` 的旧用法。
+"""
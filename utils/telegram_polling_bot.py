@@ -14,16 +14,76 @@ Environment/config:
 import os
 import time
 import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import islice
 from typing import Dict, Any, Optional, List, Tuple
 
 import requests
+from requests.adapters import HTTPAdapter
 from loguru import logger
 
 from config.settings import settings
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _loads(data: bytes) -> Any:
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+def _dumps(obj: Any) -> str:
+    if orjson is not None:
+        return orjson.dumps(obj).decode("utf-8")
+    return json.dumps(obj)
+
 
 API_BASE = f"http://127.0.0.1:{settings.API_PORT}"
 
+# Shared keep-alive session for both the Telegram API and the local API,
+# so polling cycles reuse TCP/TLS connections instead of reconnecting per call.
+_SESSION = requests.Session()
+_SESSION.headers.update({"Connection": "keep-alive"})
+_SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+_SESSION.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+
+# Short-lived cache of local API responses so bursts of the same command
+# share one request: path -> (expires_at, parsed json)
+POOL_CACHE_TTL = 5
+INTERVAL_CACHE_TTL = 10
+_API_CACHE_MAXSIZE = 16
+_api_cache: Dict[str, Tuple[float, Any]] = {}
+_api_cache_lock = threading.Lock()
+
+
+def _cached_api_get(path: str, ttl: float, timeout: float) -> Any:
+    now = time.monotonic()
+    with _api_cache_lock:
+        hit = _api_cache.get(path)
+        if hit is not None and hit[0] > now:
+            return hit[1]
+    r = _SESSION.get(f"{API_BASE}{path}", timeout=timeout)
+    r.raise_for_status()
+    js = _loads(r.content)
+    with _api_cache_lock:
+        if len(_api_cache) >= _API_CACHE_MAXSIZE:
+            # drop expired entries first, then the one closest to expiry
+            for key in [k for k, (exp, _) in _api_cache.items() if exp <= now]:
+                del _api_cache[key]
+            if len(_api_cache) >= _API_CACHE_MAXSIZE:
+                del _api_cache[min(_api_cache, key=lambda k: _api_cache[k][0])]
+        _api_cache[path] = (now + ttl, js)
+    return js
+
+
+def cache_clear() -> None:
+    with _api_cache_lock:
+        _api_cache.clear()
+
 
 def _get_token_and_chat() -> Tuple[str, str]:
     token = settings.TELEGRAM_BOT_TOKEN
@@ -35,7 +95,9 @@ def _get_token_and_chat() -> Tuple[str, str]:
     return token, chat_id
 
 
+@lru_cache(maxsize=32)
 def _tg_api(token: str, method: str) -> str:
+    # token is fixed for the bot's lifetime, so each method URL is built once
     return f"https://api.telegram.org/bot{token}/{method}"
 
 
@@ -50,10 +112,10 @@ def send_message(token: str, chat_id: str, text: str, reply_markup: Optional[Dic
     if parse_mode:
         data["parse_mode"] = parse_mode
     if reply_markup:
-        data["reply_markup"] = json.dumps(reply_markup)
+        data["reply_markup"] = _dumps(reply_markup)
     if reply_to_message_id:
         data["reply_to_message_id"] = reply_to_message_id
-    r = requests.post(_tg_api(token, "sendMessage"), data=data, timeout=15)
+    r = _SESSION.post(_tg_api(token, "sendMessage"), data=data, timeout=15)
     r.raise_for_status()
 
 
@@ -67,8 +129,8 @@ def edit_message_text(token: str, chat_id: str, message_id: int, text: str,
     if parse_mode:
         data["parse_mode"] = parse_mode
     if reply_markup:
-        data["reply_markup"] = json.dumps(reply_markup)
-    r = requests.post(_tg_api(token, "editMessageText"), data=data, timeout=15)
+        data["reply_markup"] = _dumps(reply_markup)
+    r = _SESSION.post(_tg_api(token, "editMessageText"), data=data, timeout=15)
     r.raise_for_status()
 
 
@@ -76,7 +138,7 @@ def answer_callback_query(token: str, callback_query_id: str, text: Optional[str
     data: Dict[str, Any] = {"callback_query_id": callback_query_id, "show_alert": show_alert}
     if text:
         data["text"] = text
-    r = requests.post(_tg_api(token, "answerCallbackQuery"), data=data, timeout=15)
+    r = _SESSION.post(_tg_api(token, "answerCallbackQuery"), data=data, timeout=15)
     r.raise_for_status()
 
 
@@ -85,56 +147,52 @@ def answer_callback_query(token: str, callback_query_id: str, text: Optional[str
 
 def fetch_pool() -> List[Dict[str, Any]]:
     try:
-        r = requests.get(f"{API_BASE}/funding_monitor/pool", timeout=30)
-        r.raise_for_status()
-        js = r.json()
+        js = _cached_api_get("/funding_monitor/pool", POOL_CACHE_TTL, timeout=30)
         return js.get("contracts", [])
     except Exception as e:
-        logger.error(f"fetch_pool error: {e}")
+        logger.error("fetch_pool error: {}", e)
         return []
 
 
 def fetch_interval(interval: str) -> Dict[str, Any]:
     try:
-        r = requests.get(f"{API_BASE}/funding_monitor/contracts-by-interval/{interval}", timeout=45)
-        r.raise_for_status()
-        return r.json().get("contracts", {})
+        js = _cached_api_get(f"/funding_monitor/contracts-by-interval/{interval}", INTERVAL_CACHE_TTL, timeout=45)
+        return js.get("contracts", {})
     except Exception as e:
-        logger.error(f"fetch_interval error: {e}")
+        logger.error("fetch_interval error: {}", e)
         return {}
 
 
 def trigger_refresh_candidates() -> str:
     try:
-        r = requests.post(f"{API_BASE}/funding_monitor/refresh-candidates", timeout=120)
+        r = _SESSION.post(f"{API_BASE}/funding_monitor/refresh-candidates", timeout=120)
         r.raise_for_status()
-        js = r.json()
+        js = _loads(r.content)
         return js.get("message", "刷新已触发")
     except Exception as e:
-        logger.error(f"trigger_refresh_candidates error: {e}")
+        logger.error("trigger_refresh_candidates error: {}", e)
         return f"刷新失败: {e}"
 
 
 def trigger_refresh_latest_rates() -> str:
     try:
-        r = requests.get(f"{API_BASE}/funding_monitor/latest-rates", params={"fast_mode": False, "cache_only": False}, timeout=120)
+        r = _SESSION.get(f"{API_BASE}/funding_monitor/latest-rates", params={"fast_mode": False, "cache_only": False}, timeout=120)
         r.raise_for_status()
-        js = r.json()
+        js = _loads(r.content)
         count = js.get("count", 0)
         return f"最新资金费率刷新完成，共处理 {count} 个合约"
     except Exception as e:
-        logger.error(f"trigger_refresh_latest_rates error: {e}")
+        logger.error("trigger_refresh_latest_rates error: {}", e)
         return f"刷新失败: {e}"
 
 
 def fetch_latest_detail(symbol: str) -> Optional[Dict[str, Any]]:
     # Query all-contracts (cached data for all contracts)
     try:
-        r = requests.get(f"{API_BASE}/funding_monitor/all-contracts", timeout=45)
-        if r.ok:
-            data = r.json().get("contracts", {})
-            if isinstance(data, dict) and symbol in data:
-                return data[symbol]
+        js = _cached_api_get("/funding_monitor/all-contracts", INTERVAL_CACHE_TTL, timeout=45)
+        data = js.get("contracts", {})
+        if isinstance(data, dict) and symbol in data:
+            return data[symbol]
     except Exception:
         pass
 
@@ -149,23 +207,28 @@ def fetch_latest_detail(symbol: str) -> Optional[Dict[str, Any]]:
     return None
 
 
+def _pool_line(c: Dict[str, Any]) -> Optional[str]:
+    try:
+        fr = float(c.get("funding_rate", 0.0))
+        return f"• {c.get('symbol', '?')} | 费率: {fr:.4%} | 价格: {c.get('mark_price', 0)} | {c.get('funding_interval', '?')}"
+    except Exception:
+        return None
+
+
+def _interval_line(symbol: str, info: Dict[str, Any]) -> Optional[str]:
+    try:
+        fr = float(info.get("funding_rate", 0.0))
+        return f"• {symbol} | 费率: {fr:.4%} | 价格: {info.get('mark_price', 0)}"
+    except Exception:
+        return None
+
+
 def format_pool_list(contracts: List[Dict[str, Any]], limit: int = 20) -> str:
     if not contracts:
         return "监控池为空"
     lines = ["📋 监控池（最多显示前{}个）:".format(limit)]
-    shown = 0
-    for c in contracts:
-        try:
-            symbol = c.get("symbol", "?")
-            fr = float(c.get("funding_rate", 0.0))
-            price = c.get("mark_price", 0)
-            interval = c.get("funding_interval", "?")
-            lines.append(f"• {symbol} | 费率: {fr:.4%} | 价格: {price} | {interval}")
-            shown += 1
-            if shown >= limit:
-                break
-        except Exception:
-            continue
+    # rows that fail to format are skipped and do not count toward the limit
+    lines.extend(islice(filter(None, map(_pool_line, contracts)), limit))
     lines.append("\n💡 提示：使用 /detail BTCUSDT 查看单个合约详情")
     return "\n".join(lines)
 
@@ -173,14 +236,7 @@ def format_pool_list(contracts: List[Dict[str, Any]], limit: int = 20) -> str:
 def format_interval_contracts(contracts: Dict[str, Any], interval: str) -> str:
     if not contracts:
         return f"{interval} 结算周期暂无合约"
-    items = []
-    for symbol, info in contracts.items():
-        try:
-            fr = float(info.get("funding_rate", 0.0))
-            price = info.get("mark_price", 0)
-            items.append(f"• {symbol} | 费率: {fr:.4%} | 价格: {price}")
-        except Exception:
-            continue
+    items = [line for line in (_interval_line(s, i) for s, i in contracts.items()) if line]
     text = f"{interval} 结算周期合约：\n" + "\n".join(items[:25])
     if len(items) > 25:
         text += f"\n\n... 还有 {len(items) - 25} 个合约"
@@ -206,67 +262,86 @@ def format_detail(info: Dict[str, Any], symbol: str) -> str:
     )
 
 
+HELP_TEXT = (
+    "🤖 资金费率监控机器人\n\n"
+    "可用命令：\n"
+    "• /pool - 查看监控池\n"
+    "• /detail BTCUSDT - 查看合约详情\n"
+    "• /refresh - 刷新最新资金费率\n"
+    "• /refresh_candidates - 刷新备选合约池\n"
+    "• /interval1h - 查看1小时结算周期合约\n"
+    "• /interval4h - 查看4小时结算周期合约\n"
+    "• /interval8h - 查看8小时结算周期合约\n\n"
+    "💡 提示：点击输入框左侧的⚡按钮查看所有命令"
+)
+
+
+def _cmd_help(chat_id: str, args: str) -> str:
+    return HELP_TEXT
+
+
+def _cmd_id(chat_id: str, args: str) -> str:
+    return f"当前 chat id: {chat_id}"
+
+
+def _cmd_pool(chat_id: str, args: str) -> str:
+    return format_pool_list(fetch_pool())
+
+
+def _cmd_detail(chat_id: str, args: str) -> str:
+    parts = args.split()
+    if not parts:
+        return "用法: /detail BTCUSDT"
+    symbol = parts[0].upper()
+    info = fetch_latest_detail(symbol)
+    if info:
+        return format_detail(info, symbol)
+    return f"未找到合约 {symbol} 的信息"
+
+
+def _cmd_refresh(chat_id: str, args: str) -> str:
+    cache_clear()
+    return trigger_refresh_latest_rates()
+
+
+def _cmd_refresh_candidates(chat_id: str, args: str) -> str:
+    cache_clear()
+    return trigger_refresh_candidates()
+
+
+def _cmd_interval(interval: str):
+    def handler(chat_id: str, args: str) -> str:
+        return format_interval_contracts(fetch_interval(interval), interval)
+    return handler
+
+
+# command -> handler(chat_id, args) returning the reply text
+COMMANDS = {
+    "/start": _cmd_help,
+    "/menu": _cmd_help,
+    "/id": _cmd_id,
+    "/pool": _cmd_pool,
+    "/detail": _cmd_detail,
+    "/refresh": _cmd_refresh,
+    "/refresh_candidates": _cmd_refresh_candidates,
+    "/interval1h": _cmd_interval("1h"),
+    "/interval4h": _cmd_interval("4h"),
+    "/interval8h": _cmd_interval("8h"),
+}
+
+
 def handle_command(token: str, chat_id: str, text: str, reply_to_message_id: Optional[int] = None) -> None:
-    t = text.strip()
-    if t.startswith("/start") or t.startswith("/menu"):
-        help_text = (
-            "🤖 资金费率监控机器人\n\n"
-            "可用命令：\n"
-            "• /pool - 查看监控池\n"
-            "• /detail BTCUSDT - 查看合约详情\n"
-            "• /refresh - 刷新最新资金费率\n"
-            "• /refresh_candidates - 刷新备选合约池\n"
-            "• /interval1h - 查看1小时结算周期合约\n"
-            "• /interval4h - 查看4小时结算周期合约\n"
-            "• /interval8h - 查看8小时结算周期合约\n\n"
-            "💡 提示：点击输入框左侧的⚡按钮查看所有命令"
-        )
-        send_message(token, chat_id, help_text, reply_to_message_id=reply_to_message_id)
-        return
-    if t.startswith("/id"):
-        send_message(token, chat_id, f"当前 chat id: {chat_id}", reply_to_message_id=reply_to_message_id)
-        return
-    if t.startswith("/pool"):
-        pool = fetch_pool()
-        send_message(token, chat_id, format_pool_list(pool), reply_to_message_id=reply_to_message_id)
-        return
-    if t.startswith("/detail"):
-        parts = t.split()
-        if len(parts) >= 2:
-            symbol = parts[1].upper()
-            info = fetch_latest_detail(symbol)
-            if info:
-                send_message(token, chat_id, format_detail(info, symbol), reply_to_message_id=reply_to_message_id)
-            else:
-                send_message(token, chat_id, f"未找到合约 {symbol} 的信息", reply_to_message_id=reply_to_message_id)
-        else:
-            send_message(token, chat_id, "用法: /detail BTCUSDT", reply_to_message_id=reply_to_message_id)
-        return
-    if t.startswith("/refresh"):
-        msg_text = trigger_refresh_latest_rates()
-        send_message(token, chat_id, msg_text, reply_to_message_id=reply_to_message_id)
-        return
-    if t.startswith("/refresh_candidates"):
-        msg_text = trigger_refresh_candidates()
-        send_message(token, chat_id, msg_text, reply_to_message_id=reply_to_message_id)
-        return
-    if t.startswith("/interval1h"):
-        contracts = fetch_interval("1h")
-        text = format_interval_contracts(contracts, "1h")
-        send_message(token, chat_id, text, reply_to_message_id=reply_to_message_id)
-        return
-    if t.startswith("/interval4h"):
-        contracts = fetch_interval("4h")
-        text = format_interval_contracts(contracts, "4h")
-        send_message(token, chat_id, text, reply_to_message_id=reply_to_message_id)
-        return
-    if t.startswith("/interval8h"):
-        contracts = fetch_interval("8h")
-        text = format_interval_contracts(contracts, "8h")
-        send_message(token, chat_id, text, reply_to_message_id=reply_to_message_id)
-        return
-    # default fall-through
-    send_message(token, chat_id, "未知命令，发送 /start 查看可用命令", reply_to_message_id=reply_to_message_id)
+    # split on any whitespace so "/detail\tBTCUSDT" or "/pool\nmore" still resolve
+    cmd, *rest = text.split(maxsplit=1) or [""]
+    args = rest[0] if rest else ""
+    # group chats may address commands as /pool@BotName
+    cmd = cmd.split("@", 1)[0]
+    handler = COMMANDS.get(cmd)
+    if handler is None:
+        reply = "未知命令，发送 /start 查看可用命令"
+    else:
+        reply = handler(chat_id, args)
+    send_message(token, chat_id, reply, reply_to_message_id=reply_to_message_id)
 
 
 def handle_callback_query(token: str, cq: Dict[str, Any]) -> None:
@@ -275,39 +350,61 @@ def handle_callback_query(token: str, cq: Dict[str, Any]) -> None:
     pass
 
 
+def handle_update(token: str, configured_chat: str, upd: Dict[str, Any]) -> None:
+    try:
+        # message
+        if "message" in upd:
+            msg = upd["message"]
+            chat_id = str(msg.get("chat", {}).get("id"))
+            if configured_chat and chat_id != configured_chat:
+                return
+            text = msg.get("text", "") or ""
+            mid = msg.get("message_id")
+            if text:
+                handle_command(token, chat_id, text, reply_to_message_id=mid)
+
+        # callback query
+        if "callback_query" in upd:
+            cq = upd["callback_query"]
+            chat_id = str(cq.get("message", {}).get("chat", {}).get("id"))
+            if configured_chat and chat_id != configured_chat:
+                return
+            handle_callback_query(token, cq)
+    except Exception as e:
+        logger.error("Update {} handling error: {}", upd.get("update_id"), e)
+
+
+# Updates are handled on worker threads so a slow backend call (e.g. /refresh)
+# does not stall getUpdates; the poll loop stays the single offset consumer.
+UPDATE_WORKERS = 4
+
+# Keep getUpdates responses small: cap the batch size and ask Telegram
+# to send only the update types the bot actually handles.
+GET_UPDATES_LIMIT = 20
+ALLOWED_UPDATES = _dumps(["message", "callback_query"])
+
+
 def poll_loop() -> None:
     token, configured_chat = _get_token_and_chat()
     logger.info("Starting Telegram polling bot")
     offset = None  # last_update_id + 1
+    executor = ThreadPoolExecutor(max_workers=UPDATE_WORKERS, thread_name_prefix="tg-update")
+    get_updates_url = _tg_api(token, "getUpdates")
     while True:
         try:
-            params: Dict[str, Any] = {"timeout": 50}
+            params: Dict[str, Any] = {
+                "timeout": 50,
+                "limit": GET_UPDATES_LIMIT,
+                "allowed_updates": ALLOWED_UPDATES,
+            }
             if offset is not None:
                 params["offset"] = offset
-            r = requests.get(_tg_api(token, "getUpdates"), params=params, timeout=60)
+            r = _SESSION.get(get_updates_url, params=params, timeout=(5, 60))
             r.raise_for_status()
-            updates = r.json().get("result", [])
+            updates = _loads(r.content).get("result", [])
             for upd in updates:
                 offset = upd.get("update_id", 0) + 1
-
-                # message
-                if "message" in upd:
-                    msg = upd["message"]
-                    chat_id = str(msg.get("chat", {}).get("id"))
-                    if configured_chat and chat_id != configured_chat:
-                        continue
-                    text = msg.get("text", "") or ""
-                    mid = msg.get("message_id")
-                    if text:
-                        handle_command(token, chat_id, text, reply_to_message_id=mid)
-
-                # callback query
-                if "callback_query" in upd:
-                    cq = upd["callback_query"]
-                    chat_id = str(cq.get("message", {}).get("chat", {}).get("id"))
-                    if configured_chat and chat_id != configured_chat:
-                        continue
-                    handle_callback_query(token, cq)
+                executor.submit(handle_update, token, configured_chat, upd)
 
         except requests.ReadTimeout:
             # normal long-poll timeout
@@ -316,8 +413,9 @@ def poll_loop() -> None:
             logger.info("Polling stopped by user")
             break
         except Exception as e:
-            logger.error(f"Polling error: {e}")
+            logger.error("Polling error: {}", e)
             time.sleep(3)
+    executor.shutdown(wait=False)
 
 
 if __name__ == "__main__":
@@ -1,9 +1,18 @@
 import dash
-from dash import dcc, html, Input, Output, State, callback_context
+from dash import dcc, html, dash_table, Input, Output, State, callback_context
 import dash_bootstrap_components as dbc
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
+try:
+    import orjson
+except ImportError:
+    orjson = None
 import traceback
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone, timedelta
 import os # Added for file operations
 import plotly.graph_objects as go
@@ -11,12 +20,115 @@ from plotly.subplots import make_subplots
 
 API_BASE_URL = "http://localhost:8000"
 
+# 后端请求的默认超时（连接, 读取），避免后端卡住时一直占用Dash工作线程
+DEFAULT_TIMEOUT = (3.05, 30)
+# 触发全量扫描的刷新接口耗时较长，单独放宽读取超时
+LONG_TIMEOUT = (3.05, 120)
+
+class _TimeoutHTTPAdapter(HTTPAdapter):
+    """未显式传入timeout的请求使用DEFAULT_TIMEOUT"""
+    
+    def send(self, request, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = DEFAULT_TIMEOUT
+        return super().send(request, **kwargs)
+
+# 所有后端API请求共用一个keep-alive会话，复用连接池中的TCP连接；
+# 网关类错误(502/503/504)和连接失败时对幂等请求做有限次退避重试
+_retry = Retry(total=2, backoff_factor=0.1, status_forcelist=[502, 503, 504])
+_session = requests.Session()
+_session.headers.update({"Connection": "keep-alive"})
+_session.mount("http://", _TimeoutHTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=_retry))
+_session.mount("https://", _TimeoutHTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=_retry))
+
+# 触发后端全量扫描的刷新接口：读超时或504时请求可能已在后端执行，不能重放，只重试连接失败
+_scan_retry = Retry(total=2, read=0, status=0, backoff_factor=0.1)
+_scan_session = requests.Session()
+_scan_session.headers.update({"Connection": "keep-alive"})
+_scan_session.mount("http://", _TimeoutHTTPAdapter(max_retries=_scan_retry))
+_scan_session.mount("https://", _TimeoutHTTPAdapter(max_retries=_scan_retry))
+
+def _json(response):
+    """解析响应体JSON，安装了orjson时优先使用"""
+    if orjson is not None:
+        return orjson.loads(response.content)
+    return response.json()
+
+def _load_json_file(path):
+    """读取JSON文件，安装了orjson时优先使用"""
+    if orjson is not None:
+        with open(path, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+# 并发发起互不依赖的后端请求
+_executor = ThreadPoolExecutor(max_workers=4)
+
+# 变化较慢的GET接口的短期响应缓存: url -> (过期时间, 响应)
+_response_cache = {}
+_response_cache_lock = threading.Lock()
+RESPONSE_CACHE_MAXSIZE = 256
+
+# 各接口的缓存时间(秒)：监控历史随定时任务更新，已结算的资金费率历史至少1小时才变化一次
+MONITOR_HISTORY_TTL = 55
+FUNDING_HISTORY_TTL = 600
+
+def _cached_get(url, ttl=60):
+    """带TTL缓存的GET请求，只缓存200响应，过期前重复请求直接返回缓存的响应；
+    过期后携带If-None-Match重新校验，后端返回304时沿用缓存的响应"""
+    now = time.monotonic()
+    with _response_cache_lock:
+        entry = _response_cache.get(url)
+    if entry and entry[0] > now:
+        return entry[1]
+    etag = entry[1].headers.get("ETag") if entry else None
+    response = _session.get(url, headers={"If-None-Match": etag} if etag else None)
+    if response.status_code == 304 and entry:
+        response = entry[1]
+    if response.status_code == 200:
+        with _response_cache_lock:
+            if len(_response_cache) >= RESPONSE_CACHE_MAXSIZE:
+                # 先清理过期条目，仍然超限时淘汰最早过期的条目
+                for key in [k for k, (expires, _) in _response_cache.items() if expires <= now]:
+                    del _response_cache[key]
+                if len(_response_cache) >= RESPONSE_CACHE_MAXSIZE:
+                    del _response_cache[min(_response_cache, key=lambda k: _response_cache[k][0])]
+            _response_cache[url] = (now + ttl, response)
+    return response
+
+# 长耗时回调（刷新备选池、刷新最新费率）在安装了diskcache时放到后台进程执行，
+# 不占用处理页面请求的线程；未安装时仍在请求线程内同步执行
+try:
+    import diskcache
+    from dash import DiskcacheManager
+    background_callback_manager = DiskcacheManager(diskcache.Cache("./cache/dash_background"))
+except ImportError:
+    background_callback_manager = None
+
+def background_kwargs(button_id):
+    """长耗时回调的额外参数：后台执行，并在执行期间禁用触发按钮"""
+    if background_callback_manager is None:
+        return {}
+    return {
+        "background": True,
+        "running": [(Output(button_id, "disabled"), True, False)],
+    }
+
 app = dash.Dash(__name__, external_stylesheets=[
     dbc.themes.BOOTSTRAP,
     "https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css"
-])
+], background_callback_manager=background_callback_manager)
 app.title = "加密货币资金费率监控系统"
 
+# WSGI入口，生产环境用gunicorn托管，例如：
+#   gunicorn -k gevent -w 4 --worker-connections 1000 -b 0.0.0.0:8050 web.interface:server
+server = app.server
+
+# 结算周期的显示文本，供筛选下拉框和表格共用
+INTERVAL_DISPLAY = {"1h": "1小时", "2h": "2小时", "4h": "4小时", "8h": "8小时"}
+INTERVAL_OPTIONS = [{"label": label, "value": value} for value, label in INTERVAL_DISPLAY.items()]
+
 def load_cached_data(interval="1h"):
     """直接加载本地缓存数据，优先读取最新资金费率缓存"""
     try:
@@ -25,33 +137,32 @@ def load_cached_data(interval="1h"):
         # 从统一缓存文件读取监控合约数据
         pool_contracts = []
         try:
-            with open("cache/all_funding_contracts_full.json", 'r', encoding='utf-8') as f:
-                cache_data = json.load(f)
-                
-                # 直接从缓存中获取监控合约池
-                monitor_pool = cache_data.get('monitor_pool', {})
-                
-                # 如果没有监控合约池，直接使用空数据
-                if not monitor_pool:
-                    print("⚠️ 监控合约池为空，显示空数据")
-                    monitor_pool = {}
-                
-                # 转换为列表格式
-                for symbol, info in monitor_pool.items():
-                    try:
-                        pool_contracts.append({
-                            "symbol": symbol,
-                            "exchange": info.get("exchange", "binance"),
-                            "funding_rate": float(info.get("current_funding_rate", 0)),
-                            "funding_time": info.get("next_funding_time", ""),
-                            "volume_24h": info.get("volume_24h", 0),
-                            "mark_price": info.get("mark_price", 0)
-                        })
-                    except (ValueError, TypeError) as e:
-                        print(f"⚠️ 处理监控合约 {symbol} 时出错: {e}")
-                        continue
-                
-                print(f"📋 加载了 {len(pool_contracts)} 个监控合约")
+            cache_data = _load_json_file("cache/all_funding_contracts_full.json")
+            
+            # 直接从缓存中获取监控合约池
+            monitor_pool = cache_data.get('monitor_pool', {})
+            
+            # 如果没有监控合约池，直接使用空数据
+            if not monitor_pool:
+                print("⚠️ 监控合约池为空，显示空数据")
+                monitor_pool = {}
+            
+            # 转换为列表格式
+            for symbol, info in monitor_pool.items():
+                try:
+                    pool_contracts.append({
+                        "symbol": symbol,
+                        "exchange": info.get("exchange", "binance"),
+                        "funding_rate": float(info.get("current_funding_rate", 0)),
+                        "funding_time": info.get("next_funding_time", ""),
+                        "volume_24h": info.get("volume_24h", 0),
+                        "mark_price": info.get("mark_price", 0)
+                    })
+                except (ValueError, TypeError) as e:
+                    print(f"⚠️ 处理监控合约 {symbol} 时出错: {e}")
+                    continue
+            
+            print(f"📋 加载了 {len(pool_contracts)} 个监控合约")
         except FileNotFoundError:
             print("📋 统一缓存文件不存在")
         except Exception as e:
@@ -64,8 +175,7 @@ def load_cached_data(interval="1h"):
         try:
             cache_file = "cache/all_funding_contracts_full.json"
             if os.path.exists(cache_file):
-                with open(cache_file, 'r', encoding='utf-8') as f:
-                    cache_data = json.load(f)
+                cache_data = _load_json_file(cache_file)
                 
                 # 优先使用latest_rates中的数据（如果存在）
                 latest_rates = cache_data.get('latest_rates', {})
@@ -152,7 +262,7 @@ app.layout = dbc.Container([
             html.Hr()
         ])
     ]),
-    dbc.Tabs([
+    dbc.Tabs(id="main-tabs", active_tab="candidates-overview", children=[
         dbc.Tab([
             dbc.Row([
                 dbc.Col([
@@ -181,12 +291,7 @@ app.layout = dbc.Container([
                             html.Label("结算周期:", className="me-2"),
                             dcc.Dropdown(
                                 id="interval-filter",
-                                options=[
-                                    {"label": "1小时", "value": "1h"},
-                                    {"label": "2小时", "value": "2h"},
-                                    {"label": "4小时", "value": "4h"},
-                                    {"label": "8小时", "value": "8h"}
-                                ],
+                                options=INTERVAL_OPTIONS,
                                 value="1h",  # 默认选择1小时
                                 style={"width": "150px"}
                             )
@@ -221,7 +326,8 @@ app.layout = dbc.Container([
                     dcc.Interval(
                         id="history-interval",
                         interval=30*1000,  # 30秒刷新一次
-                        n_intervals=0
+                        n_intervals=0,
+                        disabled=True  # 仅在历史入池合约标签页激活时启用
                     ),
                     # 历史数据统计
                     dbc.Row([
@@ -310,18 +416,30 @@ app.layout = dbc.Container([
     dbc.Toast(id="notification", header="通知", is_open=False, dismissable=True, duration=4000)
 ], fluid=True)
 
-# 这个回调函数现在只处理其他通知，刷新备选池由专门的回调函数处理
-@app.callback(
+# 点击刷新备选池时先在浏览器端收起旧通知，刷新结果由refresh_candidates_pool回调推送；
+# 纯界面操作，用clientside回调避免一次服务端往返
+app.clientside_callback(
+    """
+    function(n_clicks) {
+        return ["", false];
+    }
+    """,
     Output("notification", "children"),
     Output("notification", "is_open"),
-    [
-        Input("refresh-candidates-pool-btn", "n_clicks"),
-    ]
+    Input("refresh-candidates-pool-btn", "n_clicks"),
+    prevent_initial_call=True
 )
 
-def unified_notification_callback(refresh_pool_clicks):
-    # 这个回调函数现在由专门的refresh_candidates_pool函数处理
-    return "", False
+# 只有历史入池合约标签页可见时才启用自动刷新定时器，纯界面操作在浏览器端完成
+app.clientside_callback(
+    """
+    function(active_tab) {
+        return active_tab !== "history-contracts";
+    }
+    """,
+    Output("history-interval", "disabled"),
+    Input("main-tabs", "active_tab")
+)
 
 # 页面初始化回调 - 使用dcc.Store来触发初始化
 @app.callback(
@@ -384,42 +502,94 @@ def update_candidates_data(refresh_clicks, current_interval):
         error_table = html.P(f"❌ {error_msg}", className="text-danger")
         return error_table, error_table, "刷新失败", "刷新失败"
         
-def build_tables(pool_contracts, candidates, interval="1h", update_time="未知"):
-    """构建表格组件"""
-    try:
+def build_history_table(columns, rows):
+    """
+    构建虚拟滚动的历史记录表格，浏览器只渲染可见区域的行
+    
+    Args:
+        columns: [(字段id, 列名), ...]
+        rows: 已格式化的记录字典列表
+    """
+    return dash_table.DataTable(
+        columns=[{"name": name, "id": col_id} for col_id, name in columns],
+        data=rows,
+        virtualization=True,
+        fixed_rows={'headers': True},
+        page_action='none',
+        style_table={'height': '400px', 'overflowY': 'auto'},
+        style_cell={'textAlign': 'left', 'minWidth': '120px'},
+    )
+
+HISTORY_BTN_CLASS = "history-btn"
 
+def format_time(timestamp):
+    """格式化时间戳为北京时间"""
+    try:
+        if not timestamp:
+            return "未知"
         
-        def format_time(timestamp):
-            """格式化时间戳为北京时间"""
-            try:
-                if not timestamp:
-                    return "未知"
-                
-                # 如果是字符串，尝试转换为数字
-                if isinstance(timestamp, str):
-                    if timestamp.isdigit():
-                        timestamp = int(timestamp)
-                    else:
-                        return timestamp  # 如果已经是格式化的时间字符串，直接返回
-                
-                # 如果是数字时间戳
-                if isinstance(timestamp, (int, float)):
-                    # 判断是秒还是毫秒时间戳
-                    if timestamp > 1e10:  # 毫秒时间戳
-                        timestamp = timestamp / 1000
-                    
-                    # 转换为北京时间（UTC+8）
-                    utc_time = datetime.fromtimestamp(timestamp, tz=timezone.utc)
-                    beijing_time = utc_time + timedelta(hours=8)
-                    
-                    # 格式化为常见时间格式
-                    return beijing_time.strftime('%Y-%m-%d %H:%M:%S')
-                
-                return str(timestamp)
-            except Exception as e:
-                print(f"⚠️ 时间格式化失败 {timestamp}: {e}")
-                return str(timestamp)
+        # 如果是字符串，尝试转换为数字
+        if isinstance(timestamp, str):
+            if timestamp.isdigit():
+                timestamp = int(timestamp)
+            else:
+                return timestamp  # 如果已经是格式化的时间字符串，直接返回
+        
+        # 如果是数字时间戳
+        if isinstance(timestamp, (int, float)):
+            # 判断是秒还是毫秒时间戳
+            if timestamp > 1e10:  # 毫秒时间戳
+                timestamp = timestamp / 1000
+            
+            # 转换为北京时间（UTC+8）
+            utc_time = datetime.fromtimestamp(timestamp, tz=timezone.utc)
+            beijing_time = utc_time + timedelta(hours=8)
+            
+            # 格式化为常见时间格式
+            return beijing_time.strftime('%Y-%m-%d %H:%M:%S')
         
+        return str(timestamp)
+    except Exception as e:
+        print(f"⚠️ 时间格式化失败 {timestamp}: {e}")
+        return str(timestamp)
+
+def build_contract_row(symbol, info, update_time, button_type, button_title):
+    """构建单个合约的表格行，字段无法转换为数字时抛出异常"""
+    # 兼容不同的字段名
+    funding_rate = info.get("funding_rate") or info.get("current_funding_rate", 0)
+    funding_time = info.get("funding_time") or info.get("next_funding_time", "")
+    funding_interval = info.get("funding_interval", "1h")  # 获取结算周期
+    volume_24h = info.get("volume_24h", 0)
+    mark_price = info.get("mark_price", 0)
+    
+    # 格式化成交量和价格
+    formatted_volume = f"{float(volume_24h):,.0f}" if volume_24h else "未知"
+    formatted_price = f"${float(mark_price):.4f}" if mark_price else "未知"
+    
+    return html.Tr([
+        html.Td(symbol),
+        html.Td(INTERVAL_DISPLAY.get(funding_interval, funding_interval)),
+        html.Td(f"{float(funding_rate)*100:.4f}%"),
+        html.Td(format_time(funding_time)),
+        html.Td(formatted_volume),
+        html.Td(formatted_price),
+        html.Td(update_time),  # 使用全局的update_time
+        html.Td(dbc.Button("查看历史", id={"type": button_type, "index": symbol}, size="sm", color="info", className=HISTORY_BTN_CLASS, title=button_title)),
+    ])
+
+def build_contract_rows(items, update_time, button_type, title_suffix, error_label):
+    """批量构建合约表格行，items为(symbol, info)序列，跳过处理出错的合约"""
+    rows = []
+    for symbol, info in items:
+        try:
+            rows.append(build_contract_row(symbol, info, update_time, button_type, f"查看{symbol}{title_suffix}"))
+        except Exception as e:
+            print(f"⚠️ 处理{error_label} {symbol} 时出错: {e}")
+    return rows
+
+def build_tables(pool_contracts, candidates, interval="1h", update_time="未知"):
+    """构建表格组件"""
+    try:
         # 构建当前监控合约表格
         if pool_contracts and len(pool_contracts) > 0:
             pool_table_header = [html.Thead(html.Tr([
@@ -432,49 +602,10 @@ def build_tables(pool_contracts, candidates, interval="1h", update_time="未知"
                 html.Th("缓存时间"),
                 html.Th("操作")
             ]))]
-            pool_table_rows = []
-            for contract in pool_contracts:
-                try:
-                    # 兼容不同的字段名
-                    funding_rate = contract.get("funding_rate") or contract.get("current_funding_rate", 0)
-                    funding_time = contract.get("funding_time") or contract.get("next_funding_time", "")
-                    funding_interval = contract.get("funding_interval", "1h")  # 获取结算周期
-                    volume_24h = contract.get("volume_24h", 0)
-                    mark_price = contract.get("mark_price", 0)
-                    
-                    # 格式化时间
-                    formatted_time = format_time(funding_time)
-                    
-                    # 格式化成交量和价格
-                    formatted_volume = f"{float(volume_24h):,.0f}" if volume_24h else "未知"
-                    formatted_price = f"${float(mark_price):.4f}" if mark_price else "未知"
-                    
-                    # 格式化结算周期显示
-                    interval_display = funding_interval
-                    if funding_interval == "1h":
-                        interval_display = "1小时"
-                    elif funding_interval == "2h":
-                        interval_display = "2小时"
-                    elif funding_interval == "4h":
-                        interval_display = "4小时"
-                    elif funding_interval == "8h":
-                        interval_display = "8小时"
-                    
-                    pool_table_rows.append(
-                        html.Tr([
-                            html.Td(contract.get("symbol", "")),
-                            html.Td(interval_display),
-                            html.Td(f"{float(funding_rate)*100:.4f}%"),
-                            html.Td(formatted_time),
-                            html.Td(formatted_volume),
-                            html.Td(formatted_price),
-                            html.Td(update_time),  # 使用全局的update_time
-                            html.Td(dbc.Button("查看历史", id={"type": "view-monitor-history", "index": contract.get("symbol", "")}, size="sm", color="info", className="history-btn", title=f"查看{contract.get('symbol', '')}的监控历史数据")),
-                        ])
-                    )
-                except Exception as e:
-                    print(f"⚠️ 处理监控合约 {contract.get('symbol', '')} 时出错: {e}")
-                    continue
+            pool_table_rows = build_contract_rows(
+                ((c.get("symbol", ""), c) for c in pool_contracts),
+                update_time, "view-monitor-history", "的监控历史数据", "监控合约"
+            )
             pool_table = dbc.Table(pool_table_header + [html.Tbody(pool_table_rows)], bordered=True, hover=True)
         else:
             pool_table = html.P("暂无监控合约数据")
@@ -502,51 +633,10 @@ def build_tables(pool_contracts, candidates, interval="1h", update_time="未知"
                 html.Th("操作")
             ]))]
             
-            candidates_table_rows = []
-            for symbol, info in candidates.items():
-                try:
-                    # 兼容不同的字段名
-                    funding_rate = info.get("funding_rate") or info.get("current_funding_rate", 0)
-                    funding_time = info.get("funding_time") or info.get("next_funding_time", "")
-                    funding_interval = info.get("funding_interval", "1h")  # 获取结算周期
-                    volume_24h = info.get("volume_24h", 0)
-                    mark_price = info.get("mark_price", 0)
-                    
-                    # 格式化时间
-                    formatted_time = format_time(funding_time)
-                    
-                    # 格式化成交量和价格
-                    formatted_volume = f"{float(volume_24h):,.0f}" if volume_24h else "未知"
-                    formatted_price = f"${float(mark_price):.4f}" if mark_price else "未知"
-                    
-                    # 格式化结算周期显示
-                    interval_display = funding_interval
-                    if funding_interval == "1h":
-                        interval_display = "1小时"
-                    elif funding_interval == "2h":
-                        interval_display = "2小时"
-                    elif funding_interval == "4h":
-                        interval_display = "4小时"
-                    elif funding_interval == "8h":
-                        interval_display = "8小时"
-                    
-                    candidates_table_rows.append(
-                        html.Tr([
-                            html.Td(symbol),
-                            html.Td(interval_display),
-                            html.Td(f"{float(funding_rate)*100:.4f}%"),
-                            html.Td(formatted_time),
-                            html.Td(formatted_volume),
-                            html.Td(formatted_price),
-                            html.Td(update_time),
-                            html.Td(dbc.Button("查看历史", id={"type": "view-history", "index": symbol}, size="sm", color="info", className="history-btn", title=f"查看{symbol}的历史资金费率")),
-                        ])
-                    )
-                except Exception as e:
-                    print(f"⚠️ 处理合约 {symbol} 时出错: {e}")
-                    # 跳过有问题的合约
-                    continue
-                    
+            candidates_table_rows = build_contract_rows(
+                candidates.items(), update_time, "view-history", "的历史资金费率", "合约"
+            )
+            
             candidates_table = dbc.Table(candidates_table_header + [html.Tbody(candidates_table_rows)], bordered=True, hover=True)
             print(f"✅ 备选合约表格构建完成，共 {len(candidates_table_rows)} 行")
         else:
@@ -628,13 +718,13 @@ def open_history_modal(n_clicks_history, n_clicks_monitor_history, is_open):
         # 根据按钮类型调用不同的API
         if button_type == "view-monitor-history":
             # 调用监控合约历史数据API
-            resp = requests.get(f"{API_BASE_URL}/funding_monitor/history/{symbol}?days=7")
+            resp = _cached_get(f"{API_BASE_URL}/funding_monitor/history/{symbol}?days=7", ttl=MONITOR_HISTORY_TTL)
             if resp.status_code != 200:
                 error_msg = f"无法获取监控历史数据: {resp.text}"
                 print(f"❌ {error_msg}")
                 return not is_open, f"{symbol} 监控历史数据", {}, error_msg
 
-            data = resp.json()
+            data = _json(resp)
             if data.get("status") != "success":
                 error_msg = data.get("message", "获取监控历史数据失败")
                 print(f"❌ {error_msg}")
@@ -676,7 +766,7 @@ def open_history_modal(n_clicks_history, n_clicks_monitor_history, is_open):
                     {
                         'x': dates,
                         'y': funding_rates,
-                        'type': 'scatter',
+                        'type': 'scattergl',
                         'mode': 'lines+markers',
                         'name': '资金费率 (%)',
                         'yaxis': 'y'
@@ -684,7 +774,7 @@ def open_history_modal(n_clicks_history, n_clicks_monitor_history, is_open):
                     {
                         'x': dates,
                         'y': mark_prices,
-                        'type': 'scatter',
+                        'type': 'scattergl',
                         'mode': 'lines+markers',
                         'name': '标记价格',
                         'yaxis': 'y2'
@@ -692,7 +782,7 @@ def open_history_modal(n_clicks_history, n_clicks_monitor_history, is_open):
                     {
                         'x': dates,
                         'y': index_prices,
-                        'type': 'scatter',
+                        'type': 'scattergl',
                         'mode': 'lines+markers',
                         'name': '指数价格',
                         'yaxis': 'y2'
@@ -709,7 +799,7 @@ def open_history_modal(n_clicks_history, n_clicks_monitor_history, is_open):
             
             # 创建表格
             table_rows = []
-            for i, record in enumerate(history_data):
+            for record in history_data:
                 try:
                     timestamp = record.get('timestamp', '')
                     if timestamp:
@@ -721,39 +811,37 @@ def open_history_modal(n_clicks_history, n_clicks_monitor_history, is_open):
                     else:
                         formatted_time = '未知时间'
                     
-                    table_rows.append(html.Tr([
-                        html.Td(formatted_time),
-                        html.Td(f"{float(record.get('funding_rate', 0)) * 100:.4f}%"),
-                        html.Td(f"${float(record.get('mark_price', 0)):.4f}"),
-                        html.Td(f"${float(record.get('index_price', 0)):.4f}"),
-                        html.Td(record.get('data_source', 'unknown'))
-                    ]))
+                    table_rows.append({
+                        "time": formatted_time,
+                        "funding_rate": f"{float(record.get('funding_rate', 0)) * 100:.4f}%",
+                        "mark_price": f"${float(record.get('mark_price', 0)):.4f}",
+                        "index_price": f"${float(record.get('index_price', 0)):.4f}",
+                        "data_source": record.get('data_source', 'unknown'),
+                    })
                 except Exception as e:
                     print(f"⚠️ 创建表格行时出错: {e}")
                     continue
             
-            table_header = html.Thead(html.Tr([
-                html.Th("时间"),
-                html.Th("资金费率"),
-                html.Th("标记价格"),
-                html.Th("指数价格"),
-                html.Th("数据来源")
-            ]))
-            
-            table = dbc.Table([table_header, html.Tbody(table_rows)], bordered=True, hover=True)
+            table = build_history_table([
+                ("time", "时间"),
+                ("funding_rate", "资金费率"),
+                ("mark_price", "标记价格"),
+                ("index_price", "指数价格"),
+                ("data_source", "数据来源"),
+            ], table_rows)
             
             print(f"✅ 监控历史数据准备完成，图表数据: {len(dates)} 点，表格行数: {len(table_rows)}")
             return not is_open, f"{symbol} 监控历史数据", fig, table
             
         else:
             # 调用原有的历史数据API
-            resp = requests.get(f"{API_BASE_URL}/funding_rates?symbol={symbol}")
+            resp = _cached_get(f"{API_BASE_URL}/funding_rates?symbol={symbol}", ttl=FUNDING_HISTORY_TTL)
             if resp.status_code != 200:
                 error_msg = f"无法获取历史数据: {resp.text}"
                 print(f"❌ {error_msg}")
                 return not is_open, f"{symbol} 历史资金费率", {}, error_msg
 
-            data = resp.json()
+            data = _json(resp)
             funding_rates = data.get("funding_rate", [])
 
             if not funding_rates:
@@ -769,7 +857,8 @@ def open_history_modal(n_clicks_history, n_clicks_monitor_history, is_open):
                 {
                     'x': dates,
                     'y': rates,
-                    'type': 'line',
+                    'type': 'scattergl',
+                    'mode': 'lines',
                     'name': '资金费率(%)',
                     'yaxis': 'y',
                     'line': {'color': 'blue'}
@@ -777,7 +866,8 @@ def open_history_modal(n_clicks_history, n_clicks_monitor_history, is_open):
                 {
                     'x': dates,
                     'y': prices,
-                    'type': 'line',
+                    'type': 'scattergl',
+                    'mode': 'lines',
                     'name': '标记价格($)',
                     'yaxis': 'y2',
                     'line': {'color': 'red'}
@@ -840,7 +930,8 @@ def open_history_modal(n_clicks_history, n_clicks_monitor_history, is_open):
     Output("notification", "is_open", allow_duplicate=True),
     Input("get-latest-rates-btn", "n_clicks"),
     State("interval-filter", "value"),  # 获取当前选中的结算周期
-    prevent_initial_call=True
+    prevent_initial_call=True,
+    **background_kwargs("get-latest-rates-btn")
 )
 def get_latest_funding_rates(latest_rates_clicks, current_interval):
     """获取最新资金费率并更新缓存，但不改变页面展示内容"""
@@ -852,7 +943,7 @@ def get_latest_funding_rates(latest_rates_clicks, current_interval):
     
     try:
         # 调用获取最新资金费率的API（这会更新缓存）
-        latest_resp = requests.get(f"{API_BASE_URL}/funding_monitor/latest-rates")
+        latest_resp = _scan_session.get(f"{API_BASE_URL}/funding_monitor/latest-rates", timeout=LONG_TIMEOUT)
         if latest_resp.status_code != 200:
             error_msg = f"获取最新资金费率失败: {latest_resp.text}"
             print(f"❌ Web界面: {error_msg}")
@@ -862,8 +953,7 @@ def get_latest_funding_rates(latest_rates_clicks, current_interval):
         all_cache_file = "cache/all_funding_contracts_full.json"
         if os.path.exists(all_cache_file):
             try:
-                with open(all_cache_file, 'r', encoding='utf-8') as f:
-                    all_cache_data = json.load(f)
+                all_cache_data = _load_json_file(all_cache_file)
                 
                 # 获取latest_rates字段
                 latest_contracts = all_cache_data.get('latest_rates', {})
@@ -913,7 +1003,8 @@ def get_latest_funding_rates(latest_rates_clicks, current_interval):
     Output("notification", "is_open", allow_duplicate=True),
     Input("refresh-candidates-pool-btn", "n_clicks"),
     State("interval-filter", "value"),  # 获取当前选中的结算周期
-    prevent_initial_call=True
+    prevent_initial_call=True,
+    **background_kwargs("refresh-candidates-pool-btn")
 )
 def refresh_candidates_pool(refresh_pool_clicks, current_interval):
     """刷新备选池并更新页面显示"""
@@ -928,7 +1019,7 @@ def refresh_candidates_pool(refresh_pool_clicks, current_interval):
         print(f"📊 当前选中的结算周期: {interval}")
         
         # 调用刷新备选池API
-        refresh_resp = requests.post(f"{API_BASE_URL}/funding_monitor/refresh-candidates")
+        refresh_resp = _scan_session.post(f"{API_BASE_URL}/funding_monitor/refresh-candidates", timeout=LONG_TIMEOUT)
         if refresh_resp.status_code != 200:
             error_msg = f"刷新备选池失败: {refresh_resp.text}"
             print(f"❌ {error_msg}")
@@ -937,7 +1028,6 @@ def refresh_candidates_pool(refresh_pool_clicks, current_interval):
         print("✅ 备选池刷新成功，开始更新页面显示...")
         
         # 等待一下让缓存更新完成
-        import time
         time.sleep(2)
         
         # 重新加载数据
@@ -995,11 +1085,10 @@ def sort_candidates_by_funding_rate(asc_clicks, desc_clicks, current_interval):
                 print(f"❌ {error_msg}")
                 return dash.no_update, f"当前显示: {interval}结算周期合约 (排序失败: {error_msg})"
             
-            with open(cache_file, 'r', encoding='utf-8') as f:
-                cache_data = json.load(f)
-                # 从全量缓存中获取指定结算周期的合约
-                contracts_by_interval = cache_data.get('contracts_by_interval', {})
-                candidates = contracts_by_interval.get(interval, {})
+            cache_data = _load_json_file(cache_file)
+            # 从全量缓存中获取指定结算周期的合约
+            contracts_by_interval = cache_data.get('contracts_by_interval', {})
+            candidates = contracts_by_interval.get(interval, {})
             
             if not candidates:
                 error_msg = "没有合约数据可排序"
@@ -1034,38 +1123,7 @@ def sort_candidates_by_funding_rate(asc_clicks, desc_clicks, current_interval):
             
 
             
-            # 重新构建表格
-            def format_time(timestamp):
-                """格式化时间戳为北京时间"""
-                try:
-                    if not timestamp:
-                        return "未知"
-                    
-                    # 如果是字符串，尝试转换为数字
-                    if isinstance(timestamp, str):
-                        if timestamp.isdigit():
-                            timestamp = int(timestamp)
-                        else:
-                            return timestamp  # 如果已经是格式化的时间字符串，直接返回
-                    
-                    # 如果是数字时间戳
-                    if isinstance(timestamp, (int, float)):
-                        # 判断是秒还是毫秒时间戳
-                        if timestamp > 1e10:  # 毫秒时间戳
-                            timestamp = timestamp / 1000
-                        
-                        # 转换为北京时间（UTC+8）
-                        utc_time = datetime.fromtimestamp(timestamp, tz=timezone.utc)
-                        beijing_time = utc_time + timedelta(hours=8)
-                        
-                        # 格式化为常见时间格式
-                        return beijing_time.strftime('%Y-%m-%d %H:%M:%S')
-                    
-                    return str(timestamp)
-                except Exception as e:
-                    print(f"⚠️ 时间格式化失败 {timestamp}: {e}")
-                    return str(timestamp)
-            
+            # 重新构建表格（时间格式化复用模块级的format_time）
             # 创建可排序的资金费率列标题
             funding_rate_header = html.Th([
                 html.Span("当前资金费率", className="me-2"),
@@ -1132,7 +1190,7 @@ def sort_candidates_by_funding_rate(asc_clicks, desc_clicks, current_interval):
                             html.Td(formatted_volume),
                             html.Td(formatted_price),
                             html.Td(update_time),
-                            html.Td(dbc.Button("查看历史", id={"type": "view-history", "index": item['symbol']}, size="sm", color="info", className="history-btn", title=f"查看{item['symbol']}的历史资金费率")),
+                            html.Td(dbc.Button("查看历史", id={"type": "view-history", "index": item['symbol']}, size="sm", color="info", className=HISTORY_BTN_CLASS, title=f"查看{item['symbol']}的历史资金费率")),
                         ])
                     )
                 except Exception as e:
@@ -1167,21 +1225,24 @@ def sort_candidates_by_funding_rate(asc_clicks, desc_clicks, current_interval):
      Output("history-last-update", "children"),
      Output("history-contracts-table", "children")],
     [Input("refresh-history-btn", "n_clicks"),
-     Input("page-store", "data"),
+     Input("main-tabs", "active_tab"),
      Input("history-interval", "n_intervals")],  # 添加自动刷新输入
     prevent_initial_call=False
 )
-def load_history_contracts(refresh_clicks, page_data, interval_n):
-    """加载历史入池合约列表"""
+def load_history_contracts(refresh_clicks, active_tab, interval_n):
+    """加载历史入池合约列表，切换到该标签页时才加载"""
+    if active_tab != "history-contracts":
+        return dash.no_update, dash.no_update, dash.no_update
     try:
         # 调用API获取历史合约列表
-        response = requests.get(f"{API_BASE_URL}/funding_monitor/history-contracts")
+        # ttl=0: 每次都向后端校验，数据未变化时后端只返回304
+        response = _cached_get(f"{API_BASE_URL}/funding_monitor/history-contracts", ttl=0)
         if response.status_code != 200:
             error_msg = f"获取历史合约列表失败: {response.text}"
             print(f"❌ Web界面: {error_msg}")
             return "0", "未知", html.P(error_msg, className="text-danger")
         
-        data = response.json()
+        data = _json(response)
         contracts = data.get('contracts', [])
         timestamp = data.get('timestamp', '')
         
@@ -1312,13 +1373,13 @@ def open_history_contract_modal(n_clicks_list, is_open):
     
     try:
         # 调用API获取合约历史详情
-        response = requests.get(f"{API_BASE_URL}/funding_monitor/history-contract/{symbol}")
+        response = _cached_get(f"{API_BASE_URL}/funding_monitor/history-contract/{symbol}")
         if response.status_code != 200:
             error_msg = f"获取合约 {symbol} 历史详情失败: {response.text}"
             print(f"❌ Web界面: {error_msg}")
             return not is_open, f"错误 - {symbol}", html.P(error_msg, className="text-danger"), {}, html.P(error_msg, className="text-danger")
         
-        data = response.json()
+        data = _json(response)
         history_records = data.get('history', [])
         created_time = data.get('created_time', '')
         total_records = data.get('total_records', 0)
@@ -1396,32 +1457,8 @@ def open_history_contract_modal(n_clicks_list, is_open):
             ], width=6)
         ])
         
-        # 构建图表 - 重新处理数据确保类型正确
+        # 构建图表 - 复用上面已转换好的数值序列，不再重复逐条转换
         timestamps = [record.get('timestamp', '') for record in history_records]
-        chart_funding_rates = []
-        chart_mark_prices = []
-        
-        for record in history_records:
-            try:
-                # 确保funding_rate是数字类型
-                funding_rate = record.get('funding_rate', 0)
-                if isinstance(funding_rate, str):
-                    funding_rate = float(funding_rate) if funding_rate else 0.0
-                else:
-                    funding_rate = float(funding_rate) if funding_rate is not None else 0.0
-                chart_funding_rates.append(funding_rate)
-                
-                # 确保mark_price是数字类型
-                mark_price = record.get('mark_price', 0)
-                if isinstance(mark_price, str):
-                    mark_price = float(mark_price) if mark_price else 0.0
-                else:
-                    mark_price = float(mark_price) if mark_price is not None else 0.0
-                chart_mark_prices.append(mark_price)
-            except (ValueError, TypeError) as e:
-                print(f"⚠️ 处理图表数据时类型转换失败: {e}")
-                chart_funding_rates.append(0.0)
-                chart_mark_prices.append(0.0)
         
         # 创建图表
         fig = make_subplots(
@@ -1432,9 +1469,9 @@ def open_history_contract_modal(n_clicks_list, is_open):
         
         # 添加资金费率线
         fig.add_trace(
-            go.Scatter(
+            go.Scattergl(
                 x=timestamps,
-                y=[rate * 100 for rate in chart_funding_rates],
+                y=[rate * 100 for rate in funding_rates],
                 mode='lines+markers',
                 name='资金费率 (%)',
                 line=dict(color='blue', width=2),
@@ -1445,9 +1482,9 @@ def open_history_contract_modal(n_clicks_list, is_open):
         
         # 添加价格线
         fig.add_trace(
-            go.Scatter(
+            go.Scattergl(
                 x=timestamps,
-                y=chart_mark_prices,
+                y=mark_prices,
                 mode='lines+markers',
                 name='标记价格 ($)',
                 line=dict(color='green', width=2),
@@ -1466,63 +1503,32 @@ def open_history_contract_modal(n_clicks_list, is_open):
         fig.update_yaxes(title_text="资金费率 (%)", row=1, col=1)
         fig.update_yaxes(title_text="价格 ($)", row=2, col=1)
         
-        # 构建详细数据表格
-        history_table_header = [html.Thead(html.Tr([
-            html.Th("时间"),
-            html.Th("资金费率"),
-            html.Th("标记价格"),
-            html.Th("指数价格"),
-            html.Th("数据源"),
-            html.Th("更新时间")
-        ]))]
-        
+        # 构建详细数据表格 - 资金费率和标记价格复用上面已转换好的数值
         history_table_rows = []
-        for record in history_records:
+        for record, funding_rate, mark_price in zip(history_records, funding_rates, mark_prices):
             try:
-                # 安全地转换数据类型
-                funding_rate = record.get('funding_rate', 0)
-                if isinstance(funding_rate, str):
-                    funding_rate = float(funding_rate) if funding_rate else 0.0
-                else:
-                    funding_rate = float(funding_rate) if funding_rate is not None else 0.0
-                
-                mark_price = record.get('mark_price', 0)
-                if isinstance(mark_price, str):
-                    mark_price = float(mark_price) if mark_price else 0.0
-                else:
-                    mark_price = float(mark_price) if mark_price is not None else 0.0
-                
-                index_price = record.get('index_price', 0)
-                if isinstance(index_price, str):
-                    index_price = float(index_price) if index_price else 0.0
-                else:
-                    index_price = float(index_price) if index_price is not None else 0.0
-                
-                history_table_rows.append(
-                    html.Tr([
-                        html.Td(record.get('timestamp', '')[:19] if record.get('timestamp') else '未知'),
-                        html.Td(f"{funding_rate*100:.4f}%"),
-                        html.Td(f"${mark_price:.4f}"),
-                        html.Td(f"${index_price:.4f}"),
-                        html.Td(record.get('data_source', 'unknown')),
-                        html.Td(record.get('last_updated', '')[:19] if record.get('last_updated') else '未知')
-                    ])
-                )
+                index_price = float(record.get('index_price') or 0)
             except (ValueError, TypeError) as e:
                 print(f"⚠️ 处理表格记录时数据类型转换失败: {e}")
-                # 使用默认值
-                history_table_rows.append(
-                    html.Tr([
-                        html.Td(record.get('timestamp', '')[:19] if record.get('timestamp') else '未知'),
-                        html.Td("0.0000%"),
-                        html.Td("$0.0000"),
-                        html.Td("$0.0000"),
-                        html.Td(record.get('data_source', 'unknown')),
-                        html.Td(record.get('last_updated', '')[:19] if record.get('last_updated') else '未知')
-                    ])
-                )
+                index_price = 0.0
+            
+            history_table_rows.append({
+                "time": record.get('timestamp', '')[:19] if record.get('timestamp') else '未知',
+                "funding_rate": f"{funding_rate*100:.4f}%",
+                "mark_price": f"${mark_price:.4f}",
+                "index_price": f"${index_price:.4f}",
+                "data_source": record.get('data_source', 'unknown'),
+                "last_updated": record.get('last_updated', '')[:19] if record.get('last_updated') else '未知',
+            })
         
-        history_table = dbc.Table(history_table_header + [html.Tbody(history_table_rows)], bordered=True, hover=True, responsive=True, size="sm")
+        history_table = build_history_table([
+            ("time", "时间"),
+            ("funding_rate", "资金费率"),
+            ("mark_price", "标记价格"),
+            ("index_price", "指数价格"),
+            ("data_source", "数据源"),
+            ("last_updated", "更新时间"),
+        ], history_table_rows)
         
         return not is_open, f"{symbol} - 历史详情", stats_html, fig, history_table
         
@@ -1539,20 +1545,24 @@ def open_history_contract_modal(n_clicks_list, is_open):
      Output("avg-duration", "children"),
      Output("archive-contracts-table", "children")],
     [Input("refresh-archive-btn", "n_clicks"),
-     Input("page-store", "data")],
+     Input("main-tabs", "active_tab")],
     prevent_initial_call=False
 )
-def load_archive_data(refresh_clicks, page_data):
-    """加载归档数据"""
+def load_archive_data(refresh_clicks, active_tab):
+    """加载归档数据，切换到该标签页时才加载"""
+    if active_tab != "archive-tab":
+        return dash.no_update, dash.no_update, dash.no_update, dash.no_update
     try:
-        # 调用API获取归档统计
-        response = requests.get(f"{API_BASE_URL}/funding_monitor/archive/statistics")
+        # 归档统计和归档合约列表互不依赖，并发请求
+        stats_future = _executor.submit(_session.get, f"{API_BASE_URL}/funding_monitor/archive/statistics")
+        contracts_future = _executor.submit(_session.get, f"{API_BASE_URL}/funding_monitor/archive/contracts")
+        response = stats_future.result(timeout=30)
         if response.status_code != 200:
             error_msg = f"获取归档统计失败: {response.text}"
             print(f"❌ Web界面: {error_msg}")
             return "0", "0", "0分钟", html.P(error_msg, className="text-danger")
         
-        stats_data = response.json()
+        stats_data = _json(response)
         statistics = stats_data.get('statistics', {})
         
         total_sessions = statistics.get('total_sessions', 0)
@@ -1566,11 +1576,11 @@ def load_archive_data(refresh_clicks, page_data):
             duration_text = f"{avg_duration:.0f}分钟"
         
         # 获取归档合约列表
-        contracts_response = requests.get(f"{API_BASE_URL}/funding_monitor/archive/contracts")
+        contracts_response = contracts_future.result(timeout=30)
         if contracts_response.status_code != 200:
             contracts_table = html.P("获取归档合约列表失败", className="text-danger")
         else:
-            contracts_data = contracts_response.json()
+            contracts_data = _json(contracts_response)
             contracts = contracts_data.get('contracts', [])
             
             if contracts:
@@ -1647,9 +1657,9 @@ def load_archive_data(refresh_clicks, page_data):
 def cleanup_archive_data(cleanup_clicks):
     """清理旧归档数据"""
     try:
-        response = requests.post(f"{API_BASE_URL}/funding_monitor/archive/cleanup?days_to_keep=30")
+        response = _session.post(f"{API_BASE_URL}/funding_monitor/archive/cleanup?days_to_keep=30")
         if response.status_code == 200:
-            data = response.json()
+            data = _json(response)
             message = data.get('message', '归档数据清理完成')
             return message, True
         else:
@@ -1660,4 +1670,5 @@ def cleanup_archive_data(cleanup_clicks):
         return error_msg, True
 
 if __name__ == '__main__':
+    # 仅用于本地开发调试，生产环境请使用上面的gunicorn命令
     app.run(debug=True, host='0.0.0.0', port=8050)
\ No newline at end of file